@@ -4,14 +4,19 @@ Manages API keys, paths, severity rules, and correlation patterns.
 """
 
 import os
+import re
 from pathlib import Path
-from typing import Dict, List, Tuple
+from types import MappingProxyType
+from typing import Mapping, Optional, Sequence, Tuple
 from dataclasses import dataclass, field
 from dotenv import load_dotenv
 
-# CRITICAL: Load environment variables FIRST, before any os.getenv() calls
 env_path = Path(__file__).parent / '.env'
-load_dotenv(env_path, override=True)  # override=True ensures new values replace old ones
+
+
+def _env(name: str, default: str = ""):
+    """Dataclass default factory reading an environment variable at construction time"""
+    return field(default_factory=lambda: os.getenv(name, default))
 
 
 # ========== API Configuration ==========
@@ -20,12 +25,12 @@ class APIConfig:
     """API keys and endpoints configuration"""
     
     # LLM Provider: "openai", "gemini", "ollama", "groq"
-    llm_provider: str = os.getenv("LLM_PROVIDER", "gemini")
+    llm_provider: str = _env("LLM_PROVIDER", "gemini")
     
     # API Keys
-    openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
-    gemini_api_key: str = os.getenv("GEMINI_API_KEY", "")
-    groq_api_key: str = os.getenv("GROQ_API_KEY", "")
+    openai_api_key: str = _env("OPENAI_API_KEY")
+    gemini_api_key: str = _env("GEMINI_API_KEY")
+    groq_api_key: str = _env("GROQ_API_KEY")
     
     # Model names
     openai_model: str = "gpt-4"
@@ -35,6 +40,21 @@ class APIConfig:
     
     # Ollama endpoint (for local LLM)
     ollama_endpoint: str = "http://localhost:11434"
+    
+    # Per-section model overrides by provider, e.g. a smaller model for the
+    # short summary: {"openai": {"property_summary": "gpt-4o-mini"}}
+    # Section keys: property_summary, area_observations, root_cause_analysis,
+    # recommended_actions
+    section_models: Mapping[str, Mapping[str, str]] = field(default_factory=dict)
+    
+    # Providers to fail over to on rate limits or outages, e.g. "groq,gemini"
+    fallback_providers: Tuple[str, ...] = field(default_factory=lambda: tuple(
+        provider.strip() for provider in os.getenv("LLM_FALLBACK_PROVIDERS", "").split(",") if provider.strip()
+    ))
+    
+    # Request all report sections in one JSON-output call instead of one call
+    # per section (fewer input tokens, but one long decode)
+    combine_sections: bool = field(default_factory=lambda: os.getenv("DDR_COMBINE_SECTIONS", "0") == "1")
 
 
 # ========== Path Configuration ==========
@@ -50,34 +70,52 @@ class PathConfig:
     def __post_init__(self):
         self.data_dir = self.project_root / "ddr_generator" / "data"
         self.samples_dir = self.data_dir / "samples"
+        # Directories are created where they are written to (e.g. the
+        # output directory by DDRPipeline.export_reports), not at import
         self.output_dir = self.project_root / "ddr_generator" / "output"
-        
-        # Create directories if they don't exist
-        self.samples_dir.mkdir(parents=True, exist_ok=True)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
 
 
 # ========== Severity Rules Configuration ==========
+# Defaults are shared, read-only constants rather than per-instance copies
+
+# Severity weights (0-1)
+_SEVERITY_WEIGHTS: Mapping[str, float] = MappingProxyType({
+    "leakage": 1.0,
+    "dampness": 0.7,
+    "crack": 0.6,
+    "efflorescence": 0.5,
+    "tile_gap": 0.4,
+    "mild_dampness": 0.3,
+})
+
+# Area impact multipliers
+_AREA_MULTIPLIERS: Mapping[str, float] = MappingProxyType({
+    "multiple_areas": 1.5,  # Issue in 3+ areas
+    "structural": 1.8,       # External walls, ceiling
+    "wet_areas": 1.3,        # Bathrooms, kitchen
+})
+
+# Rules for severity calculation
+_SEVERITY_RULES: Mapping[str, Tuple[str, str]] = MappingProxyType({
+    # (condition_pattern, severity_level)
+    "active_leakage_plumbing": ("HIGH", "Active leakage with plumbing issues requires immediate attention"),
+    "recurring_dampness": ("MEDIUM", "Recurring dampness across multiple areas indicates ongoing moisture ingress"),
+    "external_crack_internal_damp": ("HIGH", "External cracks combined with internal dampness suggest water ingress"),
+    "skirting_dampness_multiple": ("MEDIUM", "Skirting dampness in multiple rooms indicates ground-level moisture issue"),
+    "tile_gaps_adjacent_damp": ("MEDIUM", "Tile joint gaps with adjacent area dampness suggest plumbing seepage"),
+    "mild_isolated": ("LOW", "Mild and isolated dampness with no active leakage"),
+})
+
+
 @dataclass
 class SeverityConfig:
     """Rules for severity assessment"""
     
     # Severity weights (0-1)
-    weights: Dict[str, float] = field(default_factory=lambda: {
-        "leakage": 1.0,
-        "dampness": 0.7,
-        "crack": 0.6,
-        "efflorescence": 0.5,
-        "tile_gap": 0.4,
-        "mild_dampness": 0.3,
-    })
+    weights: Mapping[str, float] = field(default_factory=lambda: _SEVERITY_WEIGHTS)
     
     # Area impact multipliers
-    area_multipliers: Dict[str, float] = field(default_factory=lambda: {
-        "multiple_areas": 1.5,  # Issue in 3+ areas
-        "structural": 1.8,       # External walls, ceiling
-        "wet_areas": 1.3,        # Bathrooms, kitchen
-    })
+    area_multipliers: Mapping[str, float] = field(default_factory=lambda: _AREA_MULTIPLIERS)
     
     # Severity thresholds
     high_threshold: float = 0.75
@@ -85,97 +123,137 @@ class SeverityConfig:
     low_threshold: float = 0.0
     
     # Rules for severity calculation
-    rules: Dict[str, Tuple[str, str]] = field(default_factory=lambda: {
-        # (condition_pattern, severity_level)
-        "active_leakage_plumbing": ("HIGH", "Active leakage with plumbing issues requires immediate attention"),
-        "recurring_dampness": ("MEDIUM", "Recurring dampness across multiple areas indicates ongoing moisture ingress"),
-        "external_crack_internal_damp": ("HIGH", "External cracks combined with internal dampness suggest water ingress"),
-        "skirting_dampness_multiple": ("MEDIUM", "Skirting dampness in multiple rooms indicates ground-level moisture issue"),
-        "tile_gaps_adjacent_damp": ("MEDIUM", "Tile joint gaps with adjacent area dampness suggest plumbing seepage"),
-        "mild_isolated": ("LOW", "Mild and isolated dampness with no active leakage"),
-    })
+    rules: Mapping[str, Tuple[str, str]] = field(default_factory=lambda: _SEVERITY_RULES)
 
 
 # ========== Correlation Rules Configuration ==========
+# Correlation patterns: (negative_pattern, positive_pattern, root_cause)
+_CORRELATION_PATTERNS: Tuple[Tuple[str, str, str], ...] = (
+    (
+        "skirting dampness",
+        "tile joint gap",
+        "Plumbing seepage from bathroom through tile joints causing dampness in adjacent room skirting"
+    ),
+    (
+        "dampness",
+        "external wall crack",
+        "Water ingress through external wall cracks leading to internal dampness"
+    ),
+    (
+        "ceiling leakage",
+        "plumbing issue",
+        "Plumbing leakage from above unit causing ceiling water damage"
+    ),
+    (
+        "wall dampness",
+        "tile joint gap",
+        "Moisture migration through compromised tile joints in wet areas"
+    ),
+    (
+        "efflorescence",
+        "dampness",
+        "Prolonged moisture exposure causing salt crystallization (efflorescence)"
+    ),
+)
+
+# Adjacent area mappings (for deduction)
+_ADJACENT_AREAS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "common_bathroom": ("hall", "common_bedroom"),
+    "master_bathroom": ("master_bedroom",),
+    "kitchen": ("hall", "common_bedroom"),
+    "parking": ("hall",),  # Below hall
+})
+
+# Keywords for area type classification
+_AREA_TYPE_KEYWORDS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "wet_area": ("bathroom", "kitchen", "toilet", "washroom"),
+    "living_area": ("hall", "living", "drawing", "lounge"),
+    "bedroom": ("bedroom", "master", "common"),
+    "utility": ("parking", "balcony", "terrace", "corridor"),
+})
+
+
 @dataclass
 class CorrelationConfig:
     """Rules for cross-area correlation"""
     
     # Correlation patterns: (negative_pattern, positive_pattern, root_cause)
-    patterns: List[Tuple[str, str, str]] = field(default_factory=lambda: [
-        (
-            "skirting dampness",
-            "tile joint gap",
-            "Plumbing seepage from bathroom through tile joints causing dampness in adjacent room skirting"
-        ),
-        (
-            "dampness",
-            "external wall crack",
-            "Water ingress through external wall cracks leading to internal dampness"
-        ),
-        (
-            "ceiling leakage",
-            "plumbing issue",
-            "Plumbing leakage from above unit causing ceiling water damage"
-        ),
-        (
-            "wall dampness",
-            "tile joint gap",
-            "Moisture migration through compromised tile joints in wet areas"
-        ),
-        (
-            "efflorescence",
-            "dampness",
-            "Prolonged moisture exposure causing salt crystallization (efflorescence)"
-        ),
-    ])
+    patterns: Tuple[Tuple[str, str, str], ...] = _CORRELATION_PATTERNS
     
     # Adjacent area mappings (for deduction)
-    adjacent_areas: Dict[str, List[str]] = field(default_factory=lambda: {
-        "common_bathroom": ["hall", "common_bedroom"],
-        "master_bathroom": ["master_bedroom"],
-        "kitchen": ["hall", "common_bedroom"],
-        "parking": ["hall"],  # Below hall
-    })
+    adjacent_areas: Mapping[str, Tuple[str, ...]] = field(default_factory=lambda: _ADJACENT_AREAS)
     
     # Keywords for area type classification
-    area_keywords: Dict[str, List[str]] = field(default_factory=lambda: {
-        "wet_area": ["bathroom", "kitchen", "toilet", "washroom"],
-        "living_area": ["hall", "living", "drawing", "lounge"],
-        "bedroom": ["bedroom", "master", "common"],
-        "utility": ["parking", "balcony", "terrace", "corridor"],
-    })
+    area_keywords: Mapping[str, Tuple[str, ...]] = field(default_factory=lambda: _AREA_TYPE_KEYWORDS)
 
 
 # ========== Extraction Patterns Configuration ==========
+# Keywords to identify negative findings
+_NEGATIVE_KEYWORDS: Tuple[str, ...] = (
+    "dampness", "leakage", "crack", "efflorescence", "seepage",
+    "stain", "moisture", "wet", "damage", "deterioration"
+)
+
+# Keywords to identify positive findings (causes/sources)
+_POSITIVE_KEYWORDS: Tuple[str, ...] = (
+    "tile joint", "gap", "crack", "plumbing issue", "pipe",
+    "external wall", "terrace", "drainage", "waterproofing"
+)
+
+# Thermal temperature patterns
+_THERMAL_PATTERNS: Mapping[str, float] = MappingProxyType({
+    "cold_threshold": 23.0,  # Temperatures below this are cold spots
+    "hot_threshold": 26.0,   # Temperatures above this are hot spots
+    "significant_diff": 3.0,  # Temperature difference indicating issue
+})
+
+# Table detection keywords
+_TABLE_HEADERS: Tuple[str, ...] = (
+    "impacted area", "exposed area", "negative side", "positive side",
+    "area", "observation", "finding", "issue", "location"
+)
+
+
+def _keyword_pattern(keywords: Sequence[str]) -> "re.Pattern[str]":
+    """Compile a keyword list into a single alternation over lowercased text"""
+    return re.compile("|".join(re.escape(keyword.lower()) for keyword in keywords))
+
+
 @dataclass
 class ExtractionConfig:
     """Patterns for text extraction from PDFs"""
     
     # Keywords to identify negative findings
-    negative_keywords: List[str] = field(default_factory=lambda: [
-        "dampness", "leakage", "crack", "efflorescence", "seepage",
-        "stain", "moisture", "wet", "damage", "deterioration"
-    ])
+    negative_keywords: Tuple[str, ...] = _NEGATIVE_KEYWORDS
     
     # Keywords to identify positive findings (causes/sources)
-    positive_keywords: List[str] = field(default_factory=lambda: [
-        "tile joint", "gap", "crack", "plumbing issue", "pipe",
-        "external wall", "terrace", "drainage", "waterproofing"
-    ])
+    positive_keywords: Tuple[str, ...] = _POSITIVE_KEYWORDS
     
     # Thermal temperature patterns
-    thermal_patterns: Dict[str, float] = field(default_factory=lambda: {
-        "cold_threshold": 23.0,  # Temperatures below this are cold spots
-        "hot_threshold": 26.0,   # Temperatures above this are hot spots
-        "significant_diff": 3.0,  # Temperature difference indicating issue
-    })
+    thermal_patterns: Mapping[str, float] = field(default_factory=lambda: _THERMAL_PATTERNS)
     
     # Table detection keywords
-    table_headers: List[str] = field(default_factory=lambda: [
-        "impacted area", "exposed area", "negative side", "positive side",
-        "area", "observation", "finding", "issue", "location"
-    ])
+    table_headers: Tuple[str, ...] = _TABLE_HEADERS
+    
+    # Upper bound on findings collected by text-based parsing, so malformed
+    # or pathological PDFs cannot blow up parsing time (0 disables the cap)
+    max_text_findings: int = 2000
+    
+    # Thermal reports whose text yields at least this many areas with both a
+    # cold and a hot spot skip the table pass (0 always parses tables)
+    min_areas_to_skip_tables: int = 5
+    
+    # Compiled keyword alternations, shared by every parser instance
+    negative_pattern: "re.Pattern[str]" = field(init=False, repr=False)
+    positive_pattern: "re.Pattern[str]" = field(init=False, repr=False)
+    observation_pattern: "re.Pattern[str]" = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        self.negative_pattern = _keyword_pattern(self.negative_keywords)
+        self.positive_pattern = _keyword_pattern(self.positive_keywords)
+        self.observation_pattern = _keyword_pattern(
+            tuple(self.negative_keywords) + tuple(self.positive_keywords)
+        )
 
 
 # ========== Deduplication Configuration ==========
@@ -191,6 +269,43 @@ class DeduplicationConfig:
     
     # Sentence transformer model name
     embedding_model: str = "all-MiniLM-L6-v2"
+    
+    # Findings per encoder forward pass; batches are length-sorted, so
+    # short findings are not padded to the longest one
+    embedding_batch_size: int = 64
+    
+    # Cap on torch CPU threads for the encoder (more only thrash on many-core
+    # hosts), e.g. DDR_EMBEDDING_THREADS=8. The setting is process-wide, so it
+    # is only applied when set; by default torch's own choice is kept
+    embedding_max_threads: Optional[int] = field(
+        default_factory=lambda: int(os.getenv("DDR_EMBEDDING_THREADS", "0")) or None
+    )
+    
+    # Quantized ONNX export of the model run through ONNX Runtime (needs
+    # sentence-transformers[onnx]); empty to always use the PyTorch model
+    embedding_onnx_file: str = "onnx/model_quint8_avx2.onnx"
+    
+    # Finding embeddings kept across calls (least recently used evicted first)
+    embedding_cache_size: int = 10_000
+    
+    # Precision embeddings are stored in; float16 halves the cache and the
+    # rows gathered per call, similarities are still computed in float32
+    embedding_dtype: str = "float16"
+
+
+# ========== LLM Response Cache Configuration ==========
+@dataclass
+class LLMCacheConfig:
+    """Settings for caching LLM responses"""
+    
+    # "none" (default) or "exact"
+    mode: str = _env("DDR_LLM_CACHE", "none")
+    
+    # Directory for cached responses
+    cache_dir: Path = field(default_factory=lambda: Path(os.getenv("DDR_CACHE_DIR", "~/.ddr_cache")).expanduser())
+    
+    # Entries older than this are ignored
+    ttl_seconds: int = 7 * 86400
 
 
 # ========== Global Configuration Instance ==========
@@ -198,12 +313,15 @@ class Config:
     """Main configuration object"""
     
     def __init__(self):
+        # CRITICAL: Load environment variables FIRST, before any os.getenv() calls
+        load_dotenv(env_path, override=True)  # override=True ensures new values replace old ones
         self.api = APIConfig()
         self.paths = PathConfig()
         self.severity = SeverityConfig()
         self.correlation = CorrelationConfig()
         self.extraction = ExtractionConfig()
         self.deduplication = DeduplicationConfig()
+        self.llm_cache = LLMCacheConfig()
     
     def validate(self) -> bool:
         """Validate configuration"""
@@ -4,12 +4,90 @@ Extracts area-wise findings, negative observations, and positive observations.
 """
 
 import re
-from typing import Dict, List, Tuple, Optional
-from .pdf_parser import PDFParser
+from collections import defaultdict
+from functools import lru_cache
+from typing import DefaultDict, Dict, List, Tuple, Optional
+from .pdf_parser import PDFParser, mypyc_attr
 from ..schemas import PropertyDetails, ExtractionResult
 from ..config import config
 
 
+# Property metadata patterns, keyed by PropertyDetails field
+_PROPERTY_FIELD_PATTERNS = {
+    "address": (r'address|location|property', r'[^\n]+'),
+    "inspection_date": (r'date|inspection date', r'\d{1,2}[-/]\d{1,2}[-/]\d{2,4}'),
+    "inspector_name": (r'inspector|inspected by', r'[^\n]+'),
+}
+_PROPERTY_FIELD_RES = {
+    field_name: re.compile(rf'(?:{label})[:\s]+({value})', re.IGNORECASE)
+    for field_name, (label, value) in _PROPERTY_FIELD_PATTERNS.items()
+}
+
+# All fields in a single pass; group names are PropertyDetails fields
+_PROPERTY_FIELDS_RE = re.compile(
+    '|'.join(
+        rf'(?:{label})[:\s]+(?P<{field_name}>{value})'
+        for field_name, (label, value) in _PROPERTY_FIELD_PATTERNS.items()
+    ),
+    re.IGNORECASE
+)
+_PROPERTY_FIELDS = frozenset(_PROPERTY_FIELDS_RE.groupindex)
+
+_AREA_PREFIX_RE = re.compile(r'^(area|location|room)[:\s]+', re.IGNORECASE)
+
+# Summary table column keywords
+_AREA_COLUMN_KEYWORDS = ("area", "location", "impacted area", "exposed area")
+_OBSERVATION_COLUMN_KEYWORDS = ("observation", "finding", "issue", "description")
+_COLUMN_KEYWORDS = _AREA_COLUMN_KEYWORDS + _OBSERVATION_COLUMN_KEYWORDS
+
+# Non-empty lines, streamed without building a per-page list
+_LINE_RE = re.compile(r'[^\n]+')
+
+# Section and table header classification. These run against text that has
+# already been lowercased, so no case folding is needed in the regex engine.
+_NEG_HEADER_RE = re.compile(r'impacted|negative|issue')
+_POS_HEADER_RE = re.compile(r'exposed|positive|cause')
+
+# Room-type keywords used to recognise area name lines (matched on lowercased text)
+_AREA_KEYWORD_SET = frozenset({
+    "hall", "bedroom", "bathroom", "kitchen", "parking", "balcony", "terrace", "living", "dining"
+})
+_AREA_KEYWORD_RE = re.compile("|".join(sorted(_AREA_KEYWORD_SET)))
+
+
+# Line classifiers are pure functions of the text, and inspection reports repeat
+# the same headers and boilerplate lines, so results are memoized.
+@lru_cache(maxsize=2048)
+def _matches_keywords(pattern: "re.Pattern[str]", text_lower: str) -> bool:
+    """Check whether lowercased text contains any keyword of a compiled alternation"""
+    return bool(pattern.search(text_lower))
+
+
+@lru_cache(maxsize=2048)
+def _is_area_name(text_lower: str) -> bool:
+    """Check if lowercased text is likely an area name"""
+    tokens = text_lower.split()
+    if len(tokens) > 4:
+        return False
+    
+    # Whole-word hits resolve with a set lookup; the regex still catches
+    # keywords embedded in tokens such as "bedroom-1" or "bathrooms"
+    return not _AREA_KEYWORD_SET.isdisjoint(tokens) or bool(_AREA_KEYWORD_RE.search(text_lower))
+
+
+@lru_cache(maxsize=2048)
+def _clean_area_name(area: str) -> str:
+    """Standardize area names"""
+    area = area.strip()
+    
+    # Remove common prefixes
+    area = _AREA_PREFIX_RE.sub('', area)
+    
+    # Capitalize properly
+    return area.title()
+
+
+@mypyc_attr(allow_interpreted_subclasses=True)
 class InspectionParser(PDFParser):
     """Parser for inspection reports"""
     
@@ -57,26 +135,30 @@ class InspectionParser(PDFParser):
     
     def _extract_property_details(self) -> PropertyDetails:
         """Extract property metadata from first page"""
-        # Extract text from first page
-        first_page_text = self.extract_text_by_page()[0]
+        # Extract text from first page only
+        first_page_text = next(self.extract_text_by_page_iter(), (0, ""))[1]
         
         # Try to extract property ID, address, date, etc.
-        property_details = PropertyDetails()
-        
-        # Search for common patterns
-        address_match = re.search(r'(?:address|location|property)[:\s]+([^\n]+)', first_page_text, re.IGNORECASE)
-        if address_match:
-            property_details.address = address_match.group(1).strip()
+        details: Dict[str, str] = {}
         
-        date_match = re.search(r'(?:date|inspection date)[:\s]+(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})', first_page_text, re.IGNORECASE)
-        if date_match:
-            property_details.inspection_date = date_match.group(1).strip()
+        # Search for common patterns in one scan, keeping the first match per field
+        for match in _PROPERTY_FIELDS_RE.finditer(first_page_text):
+            field_name = match.lastgroup
+            if field_name is None or field_name in details:
+                continue
+            
+            details[field_name] = match.group(field_name).strip()
+            if len(details) == len(_PROPERTY_FIELDS):
+                break
         
-        inspector_match = re.search(r'(?:inspector|inspected by)[:\s]+([^\n]+)', first_page_text, re.IGNORECASE)
-        if inspector_match:
-            property_details.inspector_name = inspector_match.group(1).strip()
+        # A field on the same line as an earlier one (e.g. "Property: ...
+        # Date: ...") is swallowed by that field's match; search for it alone
+        for field_name in _PROPERTY_FIELDS.difference(details):
+            field_match = _PROPERTY_FIELD_RES[field_name].search(first_page_text)
+            if field_match:
+                details[field_name] = field_match.group(1).strip()
         
-        return property_details
+        return PropertyDetails(**details)
     
     def _parse_summary_table(self) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
         """
@@ -85,31 +167,37 @@ class InspectionParser(PDFParser):
         Returns:
             Tuple of (negative_findings, positive_findings) dictionaries
         """
-        negative_findings = {}
-        positive_findings = {}
+        negative_findings: DefaultDict[str, List[str]] = defaultdict(list)
+        positive_findings: DefaultDict[str, List[str]] = defaultdict(list)
         
         # Find tables with relevant headers
         table_headers = self.extraction_config.table_headers
         tables = self.find_tables_by_header(table_headers)
         
         for page_num, table in tables:
-            # Identify column indices
-            header_row = [str(cell).lower() if cell else "" for cell in table[0]]
+            # Normalize the header once: lowercased cells for column lookup,
+            # and a single joined string for side classification
+            header_cells = [str(cell).lower() if cell else "" for cell in table[0]]
+            header_joined = " ".join(header_cells)
             
-            # Find area and observation columns
-            area_col = self._find_column_index(header_row, ["area", "location", "impacted area", "exposed area"])
-            obs_col = self._find_column_index(header_row, ["observation", "finding", "issue", "description"])
+            # Find area and observation columns from a single sweep of the header
+            column_map = self._build_column_map(header_cells)
+            area_col = self._find_column_index(column_map, _AREA_COLUMN_KEYWORDS)
+            obs_col = self._find_column_index(column_map, _OBSERVATION_COLUMN_KEYWORDS)
             
             if area_col is None or obs_col is None:
                 continue
             
             # Determine if this is negative or positive side
-            is_negative = any(keyword in " ".join(header_row) for keyword in ["impacted", "negative", "issue"])
-            is_positive = any(keyword in " ".join(header_row) for keyword in ["exposed", "positive", "cause"])
+            is_negative = bool(_NEG_HEADER_RE.search(header_joined))
+            is_positive = bool(_POS_HEADER_RE.search(header_joined))
+            
+            # Shortest row that still contains both columns
+            min_len = max(area_col, obs_col) + 1
             
             # Parse rows (skip header)
             for row in table[1:]:
-                if len(row) <= max(area_col, obs_col):
+                if len(row) < min_len:
                     continue
                 
                 area = str(row[area_col]).strip() if row[area_col] else ""
@@ -123,25 +211,17 @@ class InspectionParser(PDFParser):
                 
                 # Categorize based on table type
                 if is_negative:
-                    if area not in negative_findings:
-                        negative_findings[area] = []
                     negative_findings[area].append(observation)
                 elif is_positive:
-                    if area not in positive_findings:
-                        positive_findings[area] = []
                     positive_findings[area].append(observation)
                 else:
                     # Default: categorize by observation keywords
-                    if self._is_negative_finding(observation):
-                        if area not in negative_findings:
-                            negative_findings[area] = []
+                    if self._is_negative_finding(observation.lower()):
                         negative_findings[area].append(observation)
                     else:
-                        if area not in positive_findings:
-                            positive_findings[area] = []
                         positive_findings[area].append(observation)
         
-        return negative_findings, positive_findings
+        return dict(negative_findings), dict(positive_findings)
     
     def _parse_by_text(self) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
         """
@@ -150,83 +230,90 @@ class InspectionParser(PDFParser):
         Returns:
             Tuple of (negative_findings, positive_findings) dictionaries
         """
-        negative_findings = {}
-        positive_findings = {}
+        negative_findings: DefaultDict[str, List[str]] = defaultdict(list)
+        positive_findings: DefaultDict[str, List[str]] = defaultdict(list)
         
-        # Extract all text
-        all_text = self.extract_text_by_page()
+        current_section: Optional[str] = None
+        current_area: Optional[str] = None
         
-        current_section = None
-        current_area = None
+        # Bind per-line lookups to locals once instead of resolving them per line
+        is_negative_header = _NEG_HEADER_RE.search
+        is_positive_header = _POS_HEADER_RE.search
+        is_area_name = self._is_area_name
+        clean_area_name = self._clean_area_name
+        is_observation = self._is_observation
         
-        for page_num, text in all_text.items():
-            lines = text.split('\n')
-            
-            for line in lines:
-                line = line.strip()
+        # Stop scanning once the findings budget is spent
+        budget = self.extraction_config.max_text_findings
+        collected = 0
+        
+        # Stream pages rather than materializing the whole document's text
+        for page_num, text in self.extract_text_by_page_iter():
+            for line_match in _LINE_RE.finditer(text):
+                line = line_match.group(0).strip()
                 if not line:
                     continue
                 
+                # Lowercase once and share it across all the classifiers below
+                line_lower = line.lower()
+                
                 # Detect section headers
-                if re.search(r'(impacted|negative|issue)', line, re.IGNORECASE):
+                if is_negative_header(line_lower):
                     current_section = "negative"
                     continue
-                elif re.search(r'(exposed|positive|cause)', line, re.IGNORECASE):
+                elif is_positive_header(line_lower):
                     current_section = "positive"
                     continue
                 
                 # Try to detect area names (usually capitalized or contain room types)
-                if self._is_area_name(line):
-                    current_area = self._clean_area_name(line)
+                if is_area_name(line_lower):
+                    current_area = clean_area_name(line)
                     continue
                 
                 # Extract observations
                 if current_area and current_section:
-                    if self._is_observation(line):
+                    if is_observation(line_lower):
                         if current_section == "negative":
-                            if current_area not in negative_findings:
-                                negative_findings[current_area] = []
                             negative_findings[current_area].append(line)
                         elif current_section == "positive":
-                            if current_area not in positive_findings:
-                                positive_findings[current_area] = []
                             positive_findings[current_area].append(line)
+                        
+                        collected += 1
+                        if budget and collected >= budget:
+                            return dict(negative_findings), dict(positive_findings)
         
-        return negative_findings, positive_findings
+        return dict(negative_findings), dict(positive_findings)
     
-    def _find_column_index(self, header_row: List[str], keywords: List[str]) -> Optional[int]:
-        """Find column index by matching keywords"""
+    def _build_column_map(self, header_row: List[str]) -> Dict[str, int]:
+        """Map each column keyword to the first header cell containing it"""
+        column_map: Dict[str, int] = {}
         for i, cell in enumerate(header_row):
-            if any(keyword in cell for keyword in keywords):
-                return i
-        return None
+            for keyword in _COLUMN_KEYWORDS:
+                if keyword not in column_map and keyword in cell:
+                    column_map[keyword] = i
+        return column_map
+    
+    def _find_column_index(self, column_map: Dict[str, int], keywords: Tuple[str, ...]) -> Optional[int]:
+        """Find the first column matching any of the keywords"""
+        indices = [column_map[keyword] for keyword in keywords if keyword in column_map]
+        return min(indices) if indices else None
     
     def _clean_area_name(self, area: str) -> str:
         """Standardize area names"""
-        area = area.strip()
-        
-        # Remove common prefixes
-        area = re.sub(r'^(area|location|room)[:\s]+', '', area, flags=re.IGNORECASE)
-        
-        # Capitalize properly
-        return area.title()
+        return _clean_area_name(area)
     
-    def _is_negative_finding(self, text: str) -> bool:
-        """Check if observation is a negative finding"""
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in self.extraction_config.negative_keywords)
+    def _is_negative_finding(self, text_lower: str) -> bool:
+        """Check if (lowercased) observation is a negative finding"""
+        return _matches_keywords(self.extraction_config.negative_pattern, text_lower)
     
-    def _is_area_name(self, text: str) -> bool:
-        """Check if text is likely an area name"""
-        text_lower = text.lower()
-        area_keywords = ["hall", "bedroom", "bathroom", "kitchen", "parking", "balcony", "terrace", "living", "dining"]
-        return any(keyword in text_lower for keyword in area_keywords) and len(text.split()) <= 4
+    def _is_area_name(self, text_lower: str) -> bool:
+        """Check if (lowercased) text is likely an area name"""
+        return _is_area_name(text_lower)
     
-    def _is_observation(self, text: str) -> bool:
-        """Check if text is likely an observation"""
+    def _is_observation(self, text_lower: str) -> bool:
+        """Check if (lowercased) text is likely an observation"""
         # Observations usually have specific keywords and are longer
-        if len(text.split()) < 2:
+        if len(text_lower.split()) < 2:
             return False
         
-        keywords = self.extraction_config.negative_keywords + self.extraction_config.positive_keywords
-        return any(keyword in text.lower() for keyword in keywords)
+        return _matches_keywords(self.extraction_config.observation_pattern, text_lower)
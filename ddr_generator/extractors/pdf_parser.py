@@ -4,13 +4,118 @@ Handles text extraction, table detection, and image extraction.
 """
 
 import io
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple, Any, Optional
 import fitz  # PyMuPDF
 import pdfplumber
 from PIL import Image
 
+try:
+    # Aho-Corasick automaton for multi-keyword scans, when installed
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
+try:
+    # Lets interpreted parsers subclass this one when it is compiled with mypyc
+    from mypy_extensions import mypyc_attr
+except ImportError:
+    def mypyc_attr(*args, **kwargs):  # type: ignore[misc]
+        return lambda cls: cls
+
+
+# Documents with at least this many pages are extracted in a process pool;
+# below it, worker start-up costs more than it saves
+PARALLEL_MIN_PAGES = 32
+MAX_WORKERS = min(os.cpu_count() or 1, 6)
+
+# Per-process cache of opened documents, so each pool worker opens a PDF once
+_worker_docs: Dict[str, Any] = {}
+
+# Read-only memory maps backing those documents; kept alive alongside them
+_worker_maps: Dict[str, mmap.mmap] = {}
+
+
+def _worker_doc(pdf_path: str):
+    """
+    Return this worker process's handle on the PDF
+    
+    The file is memory-mapped rather than read, so every worker shares the
+    OS page cache for it instead of holding its own copy of the bytes.
+    """
+    doc = _worker_docs.get(pdf_path)
+    if doc is None:
+        fd = os.open(pdf_path, os.O_RDONLY)
+        try:
+            mapped = _worker_maps[pdf_path] = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        doc = _worker_docs[pdf_path] = fitz.open(stream=memoryview(mapped), filetype="pdf")
+    return doc
+
+
+def _keyword_finder(keywords: Iterable[str]) -> Callable[[str], Iterator[str]]:
+    """
+    Build a scanner yielding the (lowercased) keywords found in lowercased text
+    
+    With pyahocorasick installed all keywords are found in one pass over the
+    text; otherwise each keyword is a C-level substring test.
+    """
+    keywords = tuple(dict.fromkeys(keyword.lower() for keyword in keywords))
+    
+    if ahocorasick is not None and keywords:
+        automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return lambda text: (keyword for _, keyword in automaton.iter(text))
+    
+    return lambda text: (keyword for keyword in keywords if keyword in text)
+
+
+def _page_text_worker(task: Tuple[str, int]) -> Tuple[int, str]:
+    """Pool worker: extract the text of one page"""
+    pdf_path, page_num = task
+    return page_num, _worker_doc(pdf_path)[page_num].get_text("text")
+
+
+def _page_images_worker(task: Tuple[str, int]) -> Tuple[int, List[bytes]]:
+    """Pool worker: extract the encoded images of one page (PIL images are built by the caller)"""
+    pdf_path, page_num = task
+    doc = _worker_doc(pdf_path)
+    return page_num, [doc.extract_image(img[0])["image"] for img in doc[page_num].get_images()]
+
+
+# (mode, (width, height), samples) of an image already decoded by PyMuPDF
+PixelData = Tuple[str, Tuple[int, int], bytes]
+
+
+def _pixel_data(doc, xref: int) -> PixelData:
+    """Decode an image through PyMuPDF into raw RGB(A) samples"""
+    pix = fitz.Pixmap(doc, xref)
+    if pix.n - pix.alpha != 3:  # Gray, CMYK, ... -> RGB
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+    mode = "RGBA" if pix.alpha else "RGB"
+    return mode, (pix.width, pix.height), pix.samples
+
+
+def _image_from_pixels(pixels: PixelData) -> Image.Image:
+    """Wrap decoded samples in a PIL image without running a codec"""
+    mode, size, samples = pixels
+    return Image.frombuffer(mode, size, samples, "raw", mode, 0, 1)
+
+
+def _page_pixels_worker(task: Tuple[str, int]) -> Tuple[int, List[PixelData]]:
+    """Pool worker: decode the images of one page to raw samples"""
+    pdf_path, page_num = task
+    doc = _worker_doc(pdf_path)
+    return page_num, [_pixel_data(doc, img[0]) for img in doc[page_num].get_images()]
+
+
+@mypyc_attr(allow_interpreted_subclasses=True)
 class PDFParser:
     """Base PDF parser with common extraction methods"""
     
@@ -25,8 +130,30 @@ class PDFParser:
         if not self.pdf_path.exists():
             raise FileNotFoundError(f"PDF not found: {pdf_path}")
         
-        self.doc = fitz.open(pdf_path)
+        # Read the file once and parse it from memory; the pdfplumber
+        # fallback reuses the same bytes instead of reopening the file
+        self._pdf_bytes = self.pdf_path.read_bytes()
+        self.doc = fitz.open(stream=self._pdf_bytes, filetype="pdf")
         self.num_pages = len(self.doc)
+        
+        # pdfplumber handle for table extraction, opened on first use
+        self._plumber: Optional[Any] = None
+        
+        # Raw get_text("blocks") tuples per page, reused across block queries
+        self._page_blocks: Dict[int, List[Tuple]] = {}
+    
+    def _get_plumber(self):
+        """Return the shared pdfplumber document, opening it once"""
+        if self._plumber is None:
+            self._plumber = pdfplumber.open(io.BytesIO(self._pdf_bytes))
+        return self._plumber
+    
+    def _page_block_tuples(self, page_num: int) -> List[Tuple]:
+        """Return the raw text block tuples of a page, extracting them only once"""
+        blocks = self._page_blocks.get(page_num)
+        if blocks is None:
+            blocks = self._page_blocks[page_num] = self.doc[page_num].get_text("blocks")
+        return blocks
     
     def extract_text_by_page(self) -> Dict[int, str]:
         """
@@ -35,11 +162,26 @@ class PDFParser:
         Returns:
             Dictionary mapping page number to extracted text
         """
-        texts = {}
+        if self.num_pages >= PARALLEL_MIN_PAGES:
+            return dict(self._map_pages(_page_text_worker, range(self.num_pages)))
+        return dict(self.extract_text_by_page_iter())
+    
+    def _map_pages(self, worker: Callable, page_nums) -> List[Any]:
+        """Run a per-page worker over pages in a process pool"""
+        tasks = [(str(self.pdf_path), page_num) for page_num in page_nums]
+        chunksize = max(1, len(tasks) // (MAX_WORKERS * 4))
+        with ProcessPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            return list(pool.map(worker, tasks, chunksize=chunksize))
+    
+    def extract_text_by_page_iter(self) -> Iterator[Tuple[int, str]]:
+        """
+        Lazily extract text one page at a time
+        
+        Yields:
+            (page_num, text) tuples, so callers can scan and discard each page
+        """
         for page_num in range(self.num_pages):
-            page = self.doc[page_num]
-            texts[page_num] = page.get_text("text")
-        return texts
+            yield page_num, self.doc[page_num].get_text("text")
     
     def extract_text_with_layout(self, page_num: int) -> str:
         """
@@ -54,9 +196,30 @@ class PDFParser:
         page = self.doc[page_num]
         return page.get_text("blocks")
     
+    def _page_tables(self, page_nums) -> List[Tuple[int, List[List[List[str]]]]]:
+        """
+        Extract tables per page with PyMuPDF's native table finder
+        
+        Falls back to pdfplumber only when PyMuPDF finds no table on any of
+        the requested pages, so the second parser is rarely opened.
+        
+        Returns:
+            List of (page_num, tables) tuples
+        """
+        page_tables = [
+            (pnum, [table.extract() for table in self.doc[pnum].find_tables().tables])
+            for pnum in page_nums
+        ]
+        
+        if not any(tables for _, tables in page_tables):
+            pdf = self._get_plumber()
+            page_tables = [(pnum, pdf.pages[pnum].extract_tables() or []) for pnum in page_nums]
+        
+        return page_tables
+    
     def extract_tables(self, page_num: Optional[int] = None) -> List[List[List[str]]]:
         """
-        Extract tables from PDF using pdfplumber
+        Extract tables from PDF using PyMuPDF (pdfplumber as fallback)
         
         Args:
             page_num: Specific page number (None for all pages)
@@ -66,17 +229,14 @@ class PDFParser:
         """
         tables = []
         
-        with pdfplumber.open(self.pdf_path) as pdf:
-            pages_to_process = [pdf.pages[page_num]] if page_num is not None else pdf.pages
-            
-            for page in pages_to_process:
-                page_tables = page.extract_tables()
-                if page_tables:
-                    tables.extend(page_tables)
+        pages_to_process = [page_num] if page_num is not None else range(self.num_pages)
+        
+        for _, page_tables in self._page_tables(pages_to_process):
+            tables.extend(page_tables)
         
         return tables
     
-    def find_tables_by_header(self, header_keywords: List[str]) -> List[Tuple[int, List[List[str]]]]:
+    def find_tables_by_header(self, header_keywords: Sequence[str]) -> List[Tuple[int, List[List[str]]]]:
         """
         Find tables containing specific header keywords
         
@@ -88,52 +248,76 @@ class PDFParser:
         """
         matching_tables = []
         
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages):
-                tables = page.extract_tables()
-                if not tables:
+        # Keywords are lowercased and compiled once, not per table
+        find_keywords = _keyword_finder(header_keywords)
+        
+        for page_num, tables in self._page_tables(range(self.num_pages)):
+            for table in tables:
+                if not table or not table[0]:  # Empty table
                     continue
                 
-                for table in tables:
-                    if not table or not table[0]:  # Empty table
-                        continue
-                    
-                    # Check if any header keyword is in first row
-                    header_row = [str(cell).lower() if cell else "" for cell in table[0]]
-                    header_text = " ".join(header_row)
-                    
-                    if any(keyword.lower() in header_text for keyword in header_keywords):
-                        matching_tables.append((page_num, table))
+                # Check if any header keyword is in first row
+                header_text = " ".join(str(cell).lower() if cell else "" for cell in table[0])
+                
+                if next(find_keywords(header_text), None) is not None:
+                    matching_tables.append((page_num, table))
         
         return matching_tables
     
-    def extract_images(self, page_num: Optional[int] = None) -> List[Tuple[int, Image.Image]]:
+    def extract_images(self, page_num: Optional[int] = None,
+                       decode: bool = False) -> List[Tuple[int, Image.Image]]:
         """
         Extract images from PDF
         
         Args:
             page_num: Specific page number (None for all pages)
+            decode: Return images wrapping pixels already decoded by PyMuPDF,
+                skipping PIL's codecs; the default opens the embedded files
+                lazily, which holds far less memory for image-heavy reports
             
         Returns:
             List of (page_num, PIL Image) tuples
         """
-        images = []
         pages_to_process = [page_num] if page_num is not None else range(self.num_pages)
         
-        for pnum in pages_to_process:
-            page = self.doc[pnum]
-            image_list = page.get_images()
+        if len(pages_to_process) >= PARALLEL_MIN_PAGES:
+            images: List[Tuple[int, Image.Image]] = []
+            if decode:
+                for pnum, page_pixels in self._map_pages(_page_pixels_worker, pages_to_process):
+                    images.extend((pnum, _image_from_pixels(pixels)) for pixels in page_pixels)
+            else:
+                for pnum, page_images in self._map_pages(_page_images_worker, pages_to_process):
+                    images.extend((pnum, Image.open(io.BytesIO(image_bytes))) for image_bytes in page_images)
+            return images
+        
+        return list(self.extract_images_iter(page_num, decode))
+    
+    def extract_images_iter(self, page_num: Optional[int] = None,
+                            decode: bool = False) -> Iterator[Tuple[int, Image.Image]]:
+        """
+        Lazily extract images one at a time
+        
+        Args:
+            page_num: Specific page number (None for all pages)
+            decode: Return images wrapping pixels already decoded by PyMuPDF,
+                skipping PIL's codecs; the default opens the embedded files
+                lazily, which holds far less memory for image-heavy reports
             
-            for img_index, img in enumerate(image_list):
+        Yields:
+            (page_num, PIL Image) tuples, so callers need not hold every image
+        """
+        pages_to_process = [page_num] if page_num is not None else range(self.num_pages)
+        
+        for pnum in pages_to_process:
+            for img in self.doc[pnum].get_images():
                 xref = img[0]
-                base_image = self.doc.extract_image(xref)
-                image_bytes = base_image["image"]
                 
-                # Convert to PIL Image
-                pil_image = Image.open(io.BytesIO(image_bytes))
-                images.append((pnum, pil_image))
-        
-        return images
+                if decode:
+                    # PyMuPDF decodes the samples; skip PIL's codecs
+                    yield pnum, _image_from_pixels(_pixel_data(self.doc, xref))
+                else:
+                    image_bytes = self.doc.extract_image(xref)["image"]
+                    yield pnum, Image.open(io.BytesIO(image_bytes))
     
     def search_text(self, query: str, case_sensitive: bool = False) -> Dict[int, List[Tuple[str, Tuple]]]:
         """
@@ -146,14 +330,51 @@ class PDFParser:
         Returns:
             Dictionary mapping page number to list of (matched_text, bounding_box) tuples
         """
+        return {
+            page_num: [(query, rect) for rect in hits[query]]
+            for page_num, hits in self.search_texts([query]).items()
+        }
+    
+    def search_texts(self, queries: List[str]) -> Dict[int, Dict[str, List[Any]]]:
+        """
+        Search for several strings across all pages in one pass
+        
+        Each page's text is read once and scanned for every query together;
+        bounding boxes are then looked up only for the queries that occur.
+        
+        Args:
+            queries: Texts to search for (case-insensitive)
+            
+        Returns:
+            Dictionary mapping page number to {query: [bounding_box, ...]}
+        """
+        # Queries are normalized like the page text below, so a query with
+        # repeated or line-break whitespace still matches
+        by_keyword: Dict[str, List[str]] = {}
+        for query in queries:
+            keyword = " ".join(query.lower().split())
+            if keyword:
+                by_keyword.setdefault(keyword, []).append(query)
+        find_keywords = _keyword_finder(by_keyword)
+        
         results = {}
         
-        for page_num in range(self.num_pages):
+        for page_num, text in self.extract_text_by_page_iter():
+            # Collapse whitespace so phrases broken across lines still match
+            found = set(find_keywords(" ".join(text.lower().split())))
+            if not found:
+                continue
+            
             page = self.doc[page_num]
-            search_results = page.search_for(query, quads=False)
+            page_results = {}
+            for keyword in found:
+                rects = page.search_for(keyword, quads=False)
+                if rects:
+                    for query in by_keyword[keyword]:
+                        page_results[query] = rects
             
-            if search_results:
-                results[page_num] = [(query, rect) for rect in search_results]
+            if page_results:
+                results[page_num] = page_results
         
         return results
     
@@ -186,33 +407,28 @@ class PDFParser:
         Returns:
             List of text blocks with position and content
         """
-        page = self.doc[page_num]
-        blocks = page.get_text("dict")["blocks"]
-        
+        # Flat (x0, y0, x1, y1, text, block_no, block_type) tuples: PyMuPDF joins
+        # spans and lines in C instead of building the nested "dict" output
         structured_blocks = []
-        for block in blocks:
-            if block.get("type") == 0:  # Text block
-                block_info = {
-                    "bbox": block["bbox"],
-                    "text": "",
-                    "lines": []
-                }
-                
-                for line in block.get("lines", []):
-                    line_text = ""
-                    for span in line.get("spans", []):
-                        line_text += span.get("text", "")
-                    block_info["lines"].append(line_text)
-                    block_info["text"] += line_text + " "
-                
-                block_info["text"] = block_info["text"].strip()
-                structured_blocks.append(block_info)
+        for x0, y0, x1, y1, text, _, block_type in self._page_block_tuples(page_num):
+            if block_type == 0:  # Text block
+                lines = text.splitlines()
+                structured_blocks.append({
+                    "bbox": (x0, y0, x1, y1),
+                    "text": " ".join(lines).strip(),
+                    "lines": lines
+                })
         
         return structured_blocks
     
     def close(self):
         """Close the PDF document"""
+        self._page_blocks.clear()
         self.doc.close()
+        if self._plumber is not None:
+            self._plumber.close()
+            self._plumber = None
+        self._pdf_bytes = b""
     
     def __enter__(self):
         """Context manager entry"""
@@ -4,12 +4,128 @@ Extracts temperature readings, cold/hot spots, and area mappings.
 """
 
 import re
-from typing import Dict, List, Tuple, Any, Optional
+import string
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple, Any, Optional
+import numpy as np
 from .pdf_parser import PDFParser
 from ..schemas import ThermalEvidence
 from ..config import config
 
 
+# Pattern to match temperature readings: 25.5°C, 25.5 C, 25.5°, 25.5
+_TEMP_PATTERN = r'(\d{1,2}\.?\d{0,2})\s*[°]?\s*[Cc]?'
+
+try:
+    # Google RE2 (DFA-based, linear time) when installed
+    import re2
+    _TEMP_RE = re2.compile(_TEMP_PATTERN)
+except ImportError:
+    _TEMP_RE = re.compile(_TEMP_PATTERN)
+
+# Area phrase cleanup: drop anything after a colon or dash, then special chars.
+# ASCII phrases use a C-level translate table; others fall back to the regex.
+_AREA_TAIL_RE = re.compile(r'[:\-–].*$')
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+_PUNCTUATION_TABLE = str.maketrans("", "", string.punctuation.replace("_", ""))
+
+# Thermal table column keywords (matched on lowercased header cells)
+_AREA_COLUMN_KEYWORDS = ("area", "location", "room")
+_TEMP_COLUMN_KEYWORDS = ("temperature", "temp", "reading", "°c")
+
+# Text without any digit cannot hold a temperature reading
+_DIGITS = frozenset("0123456789")
+
+
+def _has_digit(text: str) -> bool:
+    """Whether text holds any digit \\d matches, checking ASCII digits first"""
+    if not _DIGITS.isdisjoint(text):
+        return True
+    return not text.isascii() and any(c.isdecimal() for c in text)
+
+# Common area keywords, in priority order
+_AREA_KEYWORDS = (
+    "hall", "bedroom", "bathroom", "kitchen", "parking",
+    "balcony", "terrace", "living", "dining", "master", "common",
+    "ceiling", "wall", "floor", "skirting"
+)
+
+try:
+    # Aho-Corasick automaton: one pass over the line finds every keyword
+    import ahocorasick
+    _AREA_AUTOMATON = ahocorasick.Automaton()
+    for _priority, _keyword in enumerate(_AREA_KEYWORDS):
+        _AREA_AUTOMATON.add_word(_keyword, (_priority, _keyword))
+    _AREA_AUTOMATON.make_automaton()
+except ImportError:
+    _AREA_AUTOMATON = None
+
+
+def _reduce_temps_numpy(temps: np.ndarray, cold_threshold: float,
+                        hot_threshold: float) -> Tuple[float, float, float, float, float]:
+    """
+    Reduce an array of readings in vectorized NumPy
+    
+    Returns:
+        (coldest below cold_threshold, hottest above hot_threshold, min, max, mean),
+        with NaN for any value that does not exist
+    """
+    if not temps.size:
+        return np.nan, np.nan, np.nan, np.nan, np.nan
+    cold = temps[temps < cold_threshold]
+    hot = temps[temps > hot_threshold]
+    return (
+        float(cold.min()) if cold.size else np.nan,
+        float(hot.max()) if hot.size else np.nan,
+        float(temps.min()),
+        float(temps.max()),
+        float(temps.mean()),
+    )
+
+
+try:
+    # Numba compiles the reduction to a single native loop, when installed
+    from numba import njit
+    
+    @njit(cache=True)
+    def _reduce_temps(temps, cold_threshold, hot_threshold):
+        """Single-pass native version of _reduce_temps_numpy"""
+        n = temps.shape[0]
+        if n == 0:
+            return np.nan, np.nan, np.nan, np.nan, np.nan
+        cold = np.inf
+        hot = -np.inf
+        low = np.inf
+        high = -np.inf
+        total = 0.0
+        for i in range(n):
+            t = temps[i]
+            if t < cold_threshold and t < cold:
+                cold = t
+            if t > hot_threshold and t > hot:
+                hot = t
+            if t < low:
+                low = t
+            if t > high:
+                high = t
+            total += t
+        if cold == np.inf:
+            cold = np.nan
+        if hot == -np.inf:
+            hot = np.nan
+        return cold, hot, low, high, total / n
+except ImportError:
+    _reduce_temps = _reduce_temps_numpy
+
+
+def _area_keywords_in(line_lower: str) -> Iterable[str]:
+    """Area keywords occurring in a lowercased line, in priority order"""
+    if _AREA_AUTOMATON is not None:
+        hits = {value for _, value in _AREA_AUTOMATON.iter(line_lower)}
+        return [keyword for _, keyword in sorted(hits)]
+    return (keyword for keyword in _AREA_KEYWORDS if keyword in line_lower)
+
+
 class ThermalParser(PDFParser):
     """Parser for thermal imaging reports"""
     
@@ -22,6 +138,10 @@ class ThermalParser(PDFParser):
         """
         super().__init__(pdf_path)
         self.thermal_config = config.extraction.thermal_patterns
+        
+        # Thresholds are read once here instead of per reading
+        self._cold_thr = float(self.thermal_config["cold_threshold"])
+        self._hot_thr = float(self.thermal_config["hot_threshold"])
     
     def parse(self) -> Dict[str, ThermalEvidence]:
         """
@@ -32,14 +152,22 @@ class ThermalParser(PDFParser):
         """
         thermal_data = {}
         
-        # Extract all text
-        all_text = self.extract_text_by_page()
-        
-        # Parse temperature readings from text
-        for page_num, text in all_text.items():
+        # Parse temperature readings from text, one page at a time
+        for page_num, text in self.extract_text_by_page_iter():
             area_readings = self._extract_temperature_readings(text)
             thermal_data.update(area_readings)
         
+        # Table extraction is the costly pass; skip it when the text already
+        # gave complete readings for enough areas
+        min_areas = config.extraction.min_areas_to_skip_tables
+        if min_areas:
+            complete = sum(
+                1 for evidence in thermal_data.values()
+                if evidence.cold_spot_temp is not None and evidence.hot_spot_temp is not None
+            )
+            if complete >= min_areas:
+                return thermal_data
+        
         # Extract from tables if available
         tables = self.extract_tables()
         for table in tables:
@@ -61,6 +189,11 @@ class ThermalParser(PDFParser):
         readings = {}
         current_area = None
         
+        # Collect raw readings per area; spots are reduced once per area below
+        area_temps: Dict[str, List[float]] = defaultdict(list)
+        cold_markers: Dict[str, List[float]] = defaultdict(list)
+        hot_markers: Dict[str, List[float]] = defaultdict(list)
+        
         lines = text.split('\n')
         
         for line in lines:
@@ -68,55 +201,56 @@ class ThermalParser(PDFParser):
             if not line:
                 continue
             
+            # Lowercase once for area detection and the spot markers
+            line_lower = line.lower()
+            
             # Try to detect area name
-            area_match = self._detect_area_in_line(line)
+            area_match = self._detect_area_in_line(line, line_lower)
             if area_match:
                 current_area = area_match
                 if current_area not in readings:
                     readings[current_area] = ThermalEvidence()
             
-            # Extract temperature readings
-            temps = self._extract_temperatures(line)
+            if not current_area:
+                continue
             
-            if temps and current_area:
-                # Update thermal evidence for current area
-                if current_area not in readings:
-                    readings[current_area] = ThermalEvidence()
-                
-                evidence = readings[current_area]
-                
-                # Identify hot and cold spots
-                for temp in temps:
-                    if temp < self.thermal_config["cold_threshold"]:
-                        if evidence.cold_spot_temp is None or temp < evidence.cold_spot_temp:
-                            evidence.cold_spot_temp = temp
-                            evidence.has_cold_zones = True
-                    
-                    if temp > self.thermal_config["hot_threshold"]:
-                        if evidence.hot_spot_temp is None or temp > evidence.hot_spot_temp:
-                            evidence.hot_spot_temp = temp
-                
-                # Calculate temperature difference
-                if evidence.cold_spot_temp and evidence.hot_spot_temp:
-                    evidence.temp_difference = round(evidence.hot_spot_temp - evidence.cold_spot_temp, 1)
+            # Header and title lines carry no digits; skip the regex for them
+            if not _has_digit(line):
+                continue
             
-            # Look for specific cold/hot spot markers
-            if "cold" in line.lower() and current_area:
-                temp = self._extract_single_temperature(line)
-                if temp and current_area in readings:
-                    if readings[current_area].cold_spot_temp is None or temp < readings[current_area].cold_spot_temp:
-                        readings[current_area].cold_spot_temp = temp
-                        readings[current_area].has_cold_zones = True
+            # Extract temperature readings
+            temps = self._extract_temperatures(line)
+            area_temps[current_area].extend(temps)
             
-            if "hot" in line.lower() and current_area:
-                temp = self._extract_single_temperature(line)
-                if temp and current_area in readings:
-                    if readings[current_area].hot_spot_temp is None or temp > readings[current_area].hot_spot_temp:
-                        readings[current_area].hot_spot_temp = temp
+            # Look for specific cold/hot spot markers (first reading on the line)
+            if temps and "cold" in line_lower:
+                cold_markers[current_area].append(temps[0])
+            if temps and "hot" in line_lower:
+                hot_markers[current_area].append(temps[0])
+        
+        cold_threshold = self._cold_thr
+        hot_threshold = self._hot_thr
         
-        # Calculate average temperatures and differences
+        # Reduce each area's readings to cold/hot spots, average and difference
         for area, evidence in readings.items():
-            if evidence.cold_spot_temp and evidence.hot_spot_temp:
+            temps = np.asarray(area_temps.get(area, ()), dtype=np.float64)
+            cold, hot, _, _, _ = _reduce_temps(temps, cold_threshold, hot_threshold)
+            
+            # Explicit cold/hot markers count as spots regardless of threshold
+            cold_spots = cold_markers.get(area, [])
+            hot_spots = hot_markers.get(area, [])
+            if not np.isnan(cold):
+                cold_spots = cold_spots + [cold]
+            if not np.isnan(hot):
+                hot_spots = hot_spots + [hot]
+            
+            if cold_spots:
+                evidence.cold_spot_temp = float(min(cold_spots))
+                evidence.has_cold_zones = True
+            if hot_spots:
+                evidence.hot_spot_temp = float(max(hot_spots))
+            
+            if evidence.cold_spot_temp is not None and evidence.hot_spot_temp is not None:
                 evidence.avg_temp = round((evidence.cold_spot_temp + evidence.hot_spot_temp) / 2, 1)
                 evidence.temp_difference = round(evidence.hot_spot_temp - evidence.cold_spot_temp, 1)
         
@@ -139,8 +273,8 @@ class ThermalParser(PDFParser):
         
         # Identify columns
         header = [str(cell).lower() if cell else "" for cell in table[0]]
-        area_col = self._find_column(header, ["area", "location", "room"])
-        temp_col = self._find_column(header, ["temperature", "temp", "reading", "°c"])
+        area_col = self._find_column(header, _AREA_COLUMN_KEYWORDS)
+        temp_col = self._find_column(header, _TEMP_COLUMN_KEYWORDS)
         
         if area_col is None:
             return readings
@@ -158,23 +292,28 @@ class ThermalParser(PDFParser):
             
             # Extract temperatures from the row
             row_text = " ".join([str(cell) for cell in row if cell])
+            if not _has_digit(row_text):
+                continue
             temps = self._extract_temperatures(row_text)
             
             if temps:
                 if area not in readings:
                     readings[area] = ThermalEvidence()
                 
-                min_temp = min(temps)
-                max_temp = max(temps)
+                row_temps = np.asarray(temps, dtype=np.float64)
+                _, _, min_temp, max_temp, mean_temp = _reduce_temps(
+                    row_temps, self._cold_thr, self._hot_thr
+                )
+                min_temp, max_temp = float(min_temp), float(max_temp)
                 
-                if min_temp < self.thermal_config["cold_threshold"]:
+                if min_temp < self._cold_thr:
                     readings[area].cold_spot_temp = min_temp
                     readings[area].has_cold_zones = True
                 
-                if max_temp > self.thermal_config["hot_threshold"]:
+                if max_temp > self._hot_thr:
                     readings[area].hot_spot_temp = max_temp
                 
-                readings[area].avg_temp = round(sum(temps) / len(temps), 1)
+                readings[area].avg_temp = round(float(mean_temp), 1)
                 readings[area].temp_difference = round(max_temp - min_temp, 1)
         
         return readings
@@ -189,12 +328,20 @@ class ThermalParser(PDFParser):
         Returns:
             List of temperature values in Celsius
         """
-        # Pattern to match temperature readings: 25.5°C, 25.5 C, 25.5°, 25.5
-        pattern = r'(\d{1,2}\.?\d{0,2})\s*[°]?\s*[Cc]?'
-        matches = re.findall(pattern, text)
+        matches = _TEMP_RE.findall(text)
         
         temps = []
         for match in matches:
+            # Integer readings dominate; range-test them as ints and only
+            # build a float for the ones that are kept. isdecimal() (unlike
+            # isdigit()) admits exactly the digits int() accepts, including
+            # non-ASCII ones that \d matches
+            if len(match) <= 2 and match.isdecimal():
+                value = int(match)
+                if 15 <= value <= 40:
+                    temps.append(float(value))
+                continue
+            
             try:
                 temp = float(match)
                 # Reasonable temperature range for buildings (15-35°C)
@@ -210,45 +357,42 @@ class ThermalParser(PDFParser):
         temps = self._extract_temperatures(text)
         return temps[0] if temps else None
     
-    def _detect_area_in_line(self, line: str) -> Optional[str]:
+    def _detect_area_in_line(self, line: str, line_lower: Optional[str] = None) -> Optional[str]:
         """
         Detect if line contains an area name
         
         Args:
             line: Text line
+            line_lower: Lowercased line, if the caller already has it
             
         Returns:
             Area name if detected, None otherwise
         """
-        line_lower = line.lower()
-        
-        # Common area keywords
-        area_keywords = [
-            "hall", "bedroom", "bathroom", "kitchen", "parking",
-            "balcony", "terrace", "living", "dining", "master", "common",
-            "ceiling", "wall", "floor", "skirting"
-        ]
+        if line_lower is None:
+            line_lower = line.lower()
         
-        for keyword in area_keywords:
-            if keyword in line_lower:
-                # Extract the area phrase (usually 2-4 words)
-                words = line.split()
-                for i, word in enumerate(words):
-                    if keyword in word.lower():
-                        # Take surrounding words
-                        start = max(0, i - 1)
-                        end = min(len(words), i + 3)
-                        area = " ".join(words[start:end])
-                        
-                        # Clean up
-                        area = re.sub(r'[:\-–].*$', '', area)  # Remove anything after colon or dash
-                        area = re.sub(r'[^\w\s]', '', area)     # Remove special chars
-                        
-                        return area.title().strip()
+        for keyword in _area_keywords_in(line_lower):
+            # Extract the area phrase (usually 2-4 words)
+            words = line.split()
+            for i, word in enumerate(words):
+                if keyword in word.lower():
+                    # Take surrounding words
+                    start = max(0, i - 1)
+                    end = min(len(words), i + 3)
+                    area = " ".join(words[start:end])
+                    
+                    # Clean up
+                    area = _AREA_TAIL_RE.sub('', area)  # Remove anything after colon or dash
+                    if area.isascii():
+                        area = area.translate(_PUNCTUATION_TABLE)  # Remove special chars
+                    else:
+                        area = _NON_WORD_RE.sub('', area)
+                    
+                    return area.title().strip()
         
         return None
     
-    def _find_column(self, header: List[str], keywords: List[str]) -> Optional[int]:
+    def _find_column(self, header: List[str], keywords: Tuple[str, ...]) -> Optional[int]:
         """Find column index by keywords"""
         for i, cell in enumerate(header):
             if any(keyword in cell for keyword in keywords):
@@ -3,45 +3,285 @@ DDR Generator: LLM-controlled report generation with fact-checking.
 Generates client-friendly reports from structured data.
 """
 
+import hashlib
+import json
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
-from ..schemas import DDRReport
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from ..schemas import AreaObservation, DDRReport
 from ..config import config
 from . import templates
+from .llm_cache import ResponseCache
+
+# Provider SDKs are optional; each is only needed for its own provider
+try:
+    import openai
+except ImportError:
+    openai = None
+
+try:
+    import google.generativeai as genai
+except ImportError:
+    genai = None
+
+try:
+    # Faster encoding/decoding of provider payloads, when installed
+    import orjson
+except ImportError:
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+# Upper bound on section LLM calls in flight at once (provider rate limits)
+MAX_CONCURRENT_LLM_CALLS = 4
+
+# Reports generated at once by generate_report_batch; each one runs its
+# own section calls, so LLM calls in flight are up to this times the above
+MAX_CONCURRENT_REPORTS = 2
+
+# Output budget for the single combined-sections request
+COMBINED_MAX_TOKENS = 4000
+
+# Output budget per section, sized to what each prompt asks for
+# (e.g. the summary is "2-3 paragraphs") with headroom
+_SECTION_MAX_TOKENS = {
+    "property_summary": 600,
+    "area_observations": 1500,
+    "root_cause_analysis": 1000,
+    "recommended_actions": 1000,
+}
+
+# Retries for transient provider errors, with jittered exponential backoff
+LLM_MAX_ATTEMPTS = 4
+LLM_BACKOFF_INITIAL = 0.5
+LLM_BACKOFF_MAX = 8.0
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+# Consecutive failed requests to a provider (counting retries, across a
+# report's concurrent section calls) after which the report stops calling it
+CIRCUIT_BREAKER_THRESHOLD = 3
+
+# Start of the placeholder written into a section whose LLM call failed
+LLM_ERROR_MARKER = "[Error generating this section"
+
+# Smoothing factor for the per-provider latency moving average
+LATENCY_EWMA_ALPHA = 0.3
+
+# Combined-response keys and the report fields they fill
+_SECTION_FIELDS = {
+    "property_summary": "property_issue_summary",
+    "area_observations": "area_wise_observations",
+    "root_cause_analysis": "probable_root_cause",
+    "recommended_actions": "recommended_actions",
+}
+
+
+class _CircuitOpenError(RuntimeError):
+    """Raised instead of a request to a provider whose circuit breaker is open"""
+
+
+class _CircuitBreaker:
+    """Consecutive failed requests per provider, shared by one report's LLM calls"""
+    
+    def __init__(self):
+        self._failures: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def is_open(self, provider: str) -> bool:
+        """Whether the provider has failed too often to be called again"""
+        return self._failures.get(provider, 0) >= CIRCUIT_BREAKER_THRESHOLD
+    
+    def record(self, provider: str, succeeded: bool):
+        """Count a failed request, or reset the count after a successful one"""
+        with self._lock:
+            self._failures[provider] = 0 if succeeded else self._failures.get(provider, 0) + 1
+
+
+def _scan_areas(areas: List[AreaObservation]) -> Tuple[List[AreaObservation], int, List[str]]:
+    """
+    Per-area facts needed by several sections, collected in one pass
+    
+    Args:
+        areas: Report areas
+    
+    Returns:
+        Tuple of (areas with issues, number of areas with thermal evidence,
+        names of areas with issues but no thermal evidence)
+    """
+    active_areas = []
+    thermal_count = 0
+    no_thermal = []
+    for area in areas:
+        has_thermal = bool(area.thermal_evidence)
+        thermal_count += has_thermal
+        if area.has_issues():
+            active_areas.append(area)
+            if not has_thermal:
+                no_thermal.append(area.area_name)
+    
+    return active_areas, thermal_count, no_thermal
 
 
 class DDRGenerator:
     """Generates final DDR report using LLM"""
     
-    def __init__(self, llm_provider: Optional[str] = None):
+    def __init__(
+        self,
+        llm_provider: Optional[str] = None,
+        cache: Optional[str] = "default",
+        combine_sections: Optional[bool] = None,
+        on_token: Optional[Callable[[str, str], None]] = None
+    ):
         """
         Initialize DDR generator
         
         Args:
             llm_provider: "openai", "gemini", or "ollama" (defaults to config)
+            cache: LLM response cache, "exact" or None
+                (defaults to config)
+            combine_sections: Request all sections in one structured (JSON)
+                call instead of one call per section (defaults to config)
+            on_token: Called with (section key, chunk) for each chunk of text as
+                it streams in; sections are generated concurrently, so chunks
+                of different sections interleave. The section key is "" for
+                the combined all-sections request. When set, responses are
+                streamed instead of awaited whole
         """
         self.provider = llm_provider or config.api.llm_provider
+        self.combine_sections = (
+            config.api.combine_sections if combine_sections is None else combine_sections
+        )
+        self.on_token = on_token
         self.client = self._initialize_llm_client()
+        
+        # Primary provider first, then configured fallbacks for failover
+        self.providers = [self.provider] + [
+            provider for provider in config.api.fallback_providers if provider != self.provider
+        ]
+        self._clients = {self.provider: self.client}
+        self._latency_ewma: Dict[str, float] = {}
+        self.cache = self._initialize_cache(config.llm_cache.mode if cache == "default" else cache)
+        
+        # Keep-alive HTTP session for the REST providers, created on first use
+        self._http = None
+        
+        # (report, formatted blocks) for the report most recently formatted
+        self._formatted_report = None
+        
+        # System prompts per section instructions, and the single-string
+        # preamble (system prompt + separator) for providers without a system
+        # role, built once so every call sends the identical prefix
+        self._system_prompts = {"": templates.SYSTEM_PROMPT}
+        for instructions in (
+            templates.PROPERTY_SUMMARY_INSTRUCTIONS,
+            templates.AREA_OBSERVATIONS_INSTRUCTIONS,
+            templates.ROOT_CAUSE_INSTRUCTIONS,
+            templates.RECOMMENDED_ACTIONS_INSTRUCTIONS,
+            templates.COMBINED_SECTIONS_INSTRUCTIONS,
+        ):
+            self._system_prompts[instructions] = f"{templates.SYSTEM_PROMPT}\n{instructions}"
+        self._preambles = {
+            system_prompt: f"{system_prompt}\n\n" for system_prompt in self._system_prompts.values()
+        }
     
-    def _initialize_llm_client(self):
+    def _initialize_llm_client(self, provider: Optional[str] = None):
         """Initialize the appropriate LLM client based on provider"""
-        if self.provider == "openai":
-            import openai
+        provider = provider or self.provider
+        
+        if provider == "openai":
+            if openai is None:
+                raise ImportError("openai is required for the openai provider (pip install openai)")
             openai.api_key = config.api.openai_api_key
             return openai
         
-        elif self.provider == "gemini":
-            import google.generativeai as genai
+        elif provider == "gemini":
+            if genai is None:
+                raise ImportError(
+                    "google-generativeai is required for the gemini provider (pip install google-generativeai)"
+                )
             genai.configure(api_key=config.api.gemini_api_key)
             return genai
         
-        elif self.provider in ["ollama", "groq"]:
+        elif provider in ["ollama", "groq"]:
             # These providers use direct REST API calls, no client library needed
             return None
         
         else:
-            raise ValueError(f"Unsupported LLM provider: {self.provider}")
+            raise ValueError(f"Unsupported LLM provider: {provider}")
+    
+    def _client_for(self, provider: str):
+        """Return the client for a provider, initializing fallbacks on first use"""
+        if provider not in self._clients:
+            self._clients[provider] = self._initialize_llm_client(provider)
+        return self._clients[provider]
+    
+    def _provider_order(self) -> List[str]:
+        """Providers to try, fastest observed first; untried fallbacks keep config order"""
+        return sorted(self.providers, key=lambda provider: self._latency_ewma.get(provider, float("inf")))
+    
+    def _record_latency(self, provider: str, seconds: float):
+        """Fold a successful call's latency into the provider's moving average"""
+        previous = self._latency_ewma.get(provider)
+        self._latency_ewma[provider] = (
+            seconds if previous is None
+            else LATENCY_EWMA_ALPHA * seconds + (1 - LATENCY_EWMA_ALPHA) * previous
+        )
+    
+    def _get_http(self):
+        """Return the shared HTTP session, so connections and TLS sessions are reused"""
+        if self._http is None:
+            session = requests.Session()
+            # Large enough for every concurrent section call to keep its connection
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._http = session
+        return self._http
+    
+    def _post_json(self, url: str, payload: dict, headers: Optional[Dict[str, str]] = None, **kwargs):
+        """POST a JSON payload on the shared session, serialized with orjson when available"""
+        if orjson is None:
+            return self._get_http().post(url, json=payload, headers=headers, **kwargs)
+        
+        headers = {"Content-Type": "application/json", **(headers or {})}
+        return self._get_http().post(url, data=orjson.dumps(payload), headers=headers, **kwargs)
+    
+    def close(self):
+        """Close pooled HTTP connections"""
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+    
+    def _initialize_cache(self, mode: Optional[str]) -> Optional[ResponseCache]:
+        """Create the response cache for the given mode (None or "none" disables it)"""
+        if not mode or mode == "none":
+            return None
+        if mode != "exact":
+            raise ValueError(f"Unsupported LLM cache mode: {mode}")
+        
+        cache_config = config.llm_cache
+        return ResponseCache(cache_config.cache_dir, ttl_seconds=cache_config.ttl_seconds)
+    
+    def _cache_namespace(self, provider: str, system_prompt: str, json_mode: bool,
+                         max_tokens: int, section: Optional[str]) -> str:
+        """Identity of everything besides the prompt that shapes a provider's response"""
+        model = {
+            "openai": config.api.openai_model,
+            "gemini": config.api.gemini_model,
+            "ollama": config.api.ollama_model,
+            "groq": config.api.groq_model,
+        }.get(provider, "")
+        return (
+            f"{provider}\x00{model}\x00{system_prompt}"
+            f"\x00{json_mode}\x00{max_tokens}\x00{self._section_model(provider, section)}"
+        )
     
     def generate_report(self, report: DDRReport) -> DDRReport:
         """
@@ -49,30 +289,169 @@ class DDRGenerator:
         
         Args:
             report: DDR report with structured data
-            
+        
         Returns:
             Report with all sections populated
         """
         print("Generating DDR report sections...")
         
-        # Generate each section
-        report.property_issue_summary = self._generate_property_summary(report)
-        report.area_wise_observations = self._generate_area_observations(report)
-        report.probable_root_cause = self._generate_root_cause_analysis(report)
-        report.recommended_actions = self._generate_recommended_actions(report)
-        report.additional_notes = self._generate_additional_notes(report)
+        # Failures are counted per report, so reports generated concurrently
+        # on this generator don't reset each other's breaker
+        breaker = _CircuitBreaker()
+        
+        # Blocks repeated across several prompts, formatted once up front
+        self._formatted(report)
+        
+        # Per-area flags, computed once and shared by every section
+        active_areas, thermal_count, no_thermal = _scan_areas(report.areas)
+        
+        # One structured call shares the prefill of the overlapping section
+        # data; fall back to per-section calls if its output is unusable
+        sections = self._generate_all_sections(report, active_areas, breaker) if self.combine_sections else None
+        
+        if sections is not None:
+            for key, field_name in _SECTION_FIELDS.items():
+                setattr(report, field_name, sections[key])
+        else:
+            self._generate_sections_concurrently(report, active_areas, breaker)
+        
+        report.additional_notes = self._generate_additional_notes(report, thermal_count)
         
         # Identify missing information
-        report.missing_information = self._identify_missing_information(report)
+        report.missing_information = self._identify_missing_information(report, no_thermal)
         
         return report
     
-    def _generate_property_summary(self, report: DDRReport) -> str:
+    def generate_report_batch(self, reports: List[DDRReport]) -> List[DDRReport]:
+        """
+        Generate several DDR reports, overlapping their LLM calls
+        
+        The reports share this generator's HTTP connection pool and response
+        cache, so connection setup and repeated prompts are paid once.
+        
+        Args:
+            reports: DDR reports with structured data
+        
+        Returns:
+            Reports with all sections populated, in the same order
+        """
+        if len(reports) <= 1:
+            return [self.generate_report(report) for report in reports]
+        
+        with ThreadPoolExecutor(max_workers=min(len(reports), MAX_CONCURRENT_REPORTS)) as pool:
+            return list(pool.map(self.generate_report, reports))
+    
+    def _formatted(self, report: DDRReport) -> Dict[str, str]:
+        """
+        Report blocks used by several prompts and the markdown export,
+        formatted once per report
+        
+        Args:
+            report: DDR report
+        
+        Returns:
+            Dict of formatted property details, root causes and priority lists
+        """
+        cached = self._formatted_report
+        if cached is not None and cached[0] is report:
+            return cached[1]
+        
+        formatted = {
+            "property_details": templates.format_property_details(report.property_details),
+        }
+        if report.correlation_result:
+            formatted["root_causes"] = templates.format_root_causes(report.correlation_result.root_causes)
+        if report.severity_assessment:
+            sev = report.severity_assessment
+            formatted["high_priority"] = templates.format_priority_list(sev.high_priority_areas)
+            formatted["medium_priority"] = templates.format_priority_list(sev.medium_priority_areas)
+            formatted["low_priority"] = templates.format_priority_list(sev.low_priority_areas)
+        
+        self._formatted_report = (report, formatted)
+        return formatted
+    
+    def _generate_sections_concurrently(self, report: DDRReport, active_areas: List[AreaObservation],
+                                        breaker: Optional[_CircuitBreaker] = None):
+        """Generate the LLM sections with one request each, in parallel"""
+        # The LLM sections are independent network calls, so issue them
+        # concurrently; total latency becomes the slowest call, not the sum
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_LLM_CALLS) as pool:
+            summary = pool.submit(self._generate_property_summary, report, active_areas, breaker)
+            observations = pool.submit(self._generate_area_observations, active_areas, breaker)
+            root_cause = pool.submit(self._generate_root_cause_analysis, report, breaker)
+            actions = pool.submit(self._generate_recommended_actions, report, breaker)
+            
+            report.property_issue_summary = summary.result()
+            report.area_wise_observations = observations.result()
+            report.probable_root_cause = root_cause.result()
+            report.recommended_actions = actions.result()
+    
+    def _generate_all_sections(self, report: DDRReport, active_areas: List[AreaObservation],
+                               breaker: Optional[_CircuitBreaker] = None) -> Optional[Dict[str, str]]:
+        """
+        Generate every LLM section with a single JSON-output request
+        
+        Returns:
+            Section key to text, or None if the response could not be used
+        """
+        print("  - Generating all sections in one request...")
+        
+        sections = {
+            "property_summary": "",
+            "area_observations": "",
+            "root_cause_analysis": "Not Available - Correlation analysis not performed",
+            "recommended_actions": "Not Available - Severity assessment not performed",
+        }
+        
+        section_data = {
+            "property_summary": self._property_summary_prompt(report, active_areas),
+            "area_observations": self._area_observations_prompt(active_areas),
+        }
+        if report.correlation_result:
+            section_data["root_cause_analysis"] = self._root_cause_prompt(report)
+        if report.severity_assessment:
+            section_data["recommended_actions"] = self._recommended_actions_prompt(report)
+        
+        prompt = "\n\n".join(f"## {key}\n{data}" for key, data in section_data.items())
+        response = self._call_llm(
+            prompt, templates.COMBINED_SECTIONS_INSTRUCTIONS,
+            json_mode=True, max_tokens=COMBINED_MAX_TOKENS, breaker=breaker
+        )
+        
+        parsed = self._parse_sections_json(response)
+        if parsed is None or not all(isinstance(parsed.get(key), str) for key in section_data):
+            print("Warning: combined section response unusable, generating sections individually")
+            return None
+        
+        for key in section_data:
+            sections[key] = parsed[key].strip()
+        return sections
+    
+    def _parse_sections_json(self, response: str) -> Optional[dict]:
+        """Parse a JSON object from a response, tolerating markdown code fences"""
+        start, end = response.find("{"), response.rfind("}")
+        if start == -1 or end <= start:
+            return None
+        try:
+            parsed = json.loads(response[start:end + 1])
+        except ValueError:
+            return None
+        return parsed if isinstance(parsed, dict) else None
+    
+    def _generate_property_summary(self, report: DDRReport, active_areas: List[AreaObservation],
+                                   breaker: Optional[_CircuitBreaker] = None) -> str:
         """Generate property issue summary section"""
         print("  - Generating property summary...")
         
+        return self._call_llm(
+            self._property_summary_prompt(report, active_areas), templates.PROPERTY_SUMMARY_INSTRUCTIONS,
+            section="property_summary", breaker=breaker
+        )
+    
+    def _property_summary_prompt(self, report: DDRReport, active_areas: List[AreaObservation]) -> str:
+        """Format the property summary data"""
         # Prepare data for prompt
-        areas_list = ", ".join([area.area_name for area in report.areas if area.has_issues()])
+        areas_list = ", ".join([area.area_name for area in active_areas])
         
         severity_info = ""
         if report.severity_assessment:
@@ -81,88 +460,105 @@ class DDRGenerator:
                 f"(Score: {report.severity_assessment.severity_score}/1.0)"
             )
         
+        formatted = self._formatted(report)
         root_causes = ""
         if report.correlation_result and report.correlation_result.root_causes:
-            root_causes = templates.format_root_causes(report.correlation_result.root_causes)
+            root_causes = formatted["root_causes"]
         
-        prompt = templates.PROPERTY_SUMMARY_PROMPT.format(
-            property_details=templates.format_property_details(report.property_details),
-            num_areas=len([a for a in report.areas if a.has_issues()]),
+        return templates.format_property_summary_prompt(
+            property_details=formatted["property_details"],
+            num_areas=len(active_areas),
             areas_list=areas_list or "Not Available",
             severity_info=severity_info or "Not Available",
             root_causes=root_causes or "Not Available"
         )
-        
-        return self._call_llm(prompt)
     
-    def _generate_area_observations(self, report: DDRReport) -> str:
+    def _generate_area_observations(self, active_areas: List[AreaObservation],
+                                    breaker: Optional[_CircuitBreaker] = None) -> str:
         """Generate area-wise observations section"""
         print("  - Generating area-wise observations...")
         
-        area_data = templates.format_area_data(report.areas)
+        return self._call_llm(
+            self._area_observations_prompt(active_areas), templates.AREA_OBSERVATIONS_INSTRUCTIONS,
+            section="area_observations", breaker=breaker
+        )
+    
+    def _area_observations_prompt(self, active_areas: List[AreaObservation]) -> str:
+        """Format the area-wise observations data"""
+        area_data = templates.format_area_data(active_areas)
         
-        prompt = templates.AREA_OBSERVATIONS_PROMPT.format(
+        return templates.format_area_observations_prompt(
             area_data=area_data
         )
-        
-        return self._call_llm(prompt)
     
-    def _generate_root_cause_analysis(self, report: DDRReport) -> str:
+    def _generate_root_cause_analysis(self, report: DDRReport,
+                                      breaker: Optional[_CircuitBreaker] = None) -> str:
         """Generate root cause analysis section"""
         print("  - Generating root cause analysis...")
         
         if not report.correlation_result:
             return "Not Available - Correlation analysis not performed"
         
-        root_causes_data = templates.format_root_causes(report.correlation_result.root_causes)
+        return self._call_llm(
+            self._root_cause_prompt(report), templates.ROOT_CAUSE_INSTRUCTIONS,
+            section="root_cause_analysis", breaker=breaker
+        )
+    
+    def _root_cause_prompt(self, report: DDRReport) -> str:
+        """Format the root cause data (requires a correlation result)"""
+        root_causes_data = self._formatted(report)["root_causes"]
         
-        cross_area_text = ""
+        parts = []
         if report.correlation_result.cross_area_links:
             for area, links in report.correlation_result.cross_area_links.items():
-                cross_area_text += f"\n**{area}:**\n"
-                for link in links:
-                    # links are now strings, not dicts
-                    cross_area_text += f"- {link}\n"
+                parts.append(f"\n**{area}:**\n")
+                # links are now strings, not dicts
+                parts.extend(f"- {link}\n" for link in links)
+        cross_area_text = "".join(parts)
         
         conflicts_text = "\n".join(report.correlation_result.conflicts) if report.correlation_result.conflicts else "None"
         
-        prompt = templates.ROOT_CAUSE_PROMPT.format(
+        return templates.format_root_cause_prompt(
             root_causes_data=root_causes_data or "No specific root causes identified",
             cross_area_links=cross_area_text or "No cross-area correlations found",
             conflicts=conflicts_text
         )
-        
-        return self._call_llm(prompt)
     
-    def _generate_recommended_actions(self, report: DDRReport) -> str:
+    def _generate_recommended_actions(self, report: DDRReport,
+                                      breaker: Optional[_CircuitBreaker] = None) -> str:
         """Generate recommended actions section"""
         print("  - Generating recommended actions...")
         
         if not report.severity_assessment:
             return "Not Available - Severity assessment not performed"
         
+        return self._call_llm(
+            self._recommended_actions_prompt(report), templates.RECOMMENDED_ACTIONS_INSTRUCTIONS,
+            section="recommended_actions", breaker=breaker
+        )
+    
+    def _recommended_actions_prompt(self, report: DDRReport) -> str:
+        """Format the recommended actions data (requires a severity assessment)"""
         sev = report.severity_assessment
+        formatted = self._formatted(report)
         
         root_causes_summary = ""
         if report.correlation_result and report.correlation_result.root_causes:
-            root_causes_summary = templates.format_root_causes(report.correlation_result.root_causes)
+            root_causes_summary = formatted["root_causes"]
         
-        prompt = templates.RECOMMENDED_ACTIONS_PROMPT.format(
+        return templates.format_recommended_actions_prompt(
             overall_severity=sev.overall_severity,
-            high_priority=templates.format_priority_list(sev.high_priority_areas),
-            medium_priority=templates.format_priority_list(sev.medium_priority_areas),
-            low_priority=templates.format_priority_list(sev.low_priority_areas),
+            high_priority=formatted["high_priority"],
+            medium_priority=formatted["medium_priority"],
+            low_priority=formatted["low_priority"],
             root_causes=root_causes_summary or "No root causes identified"
         )
-        
-        return self._call_llm(prompt)
     
-    def _generate_additional_notes(self, report: DDRReport) -> str:
+    def _generate_additional_notes(self, report: DDRReport, thermal_count: int) -> str:
         """Generate additional notes section"""
         notes = []
         
         # Add thermal imaging notes if available
-        thermal_count = sum(1 for area in report.areas if area.thermal_evidence)
         if thermal_count > 0:
             notes.append(
                 f"Thermal imaging was used in {thermal_count} area(s) to detect temperature anomalies "
@@ -187,7 +583,7 @@ class DDRGenerator:
         
         return "\n\n".join(notes)
     
-    def _identify_missing_information(self, report: DDRReport) -> list:
+    def _identify_missing_information(self, report: DDRReport, no_thermal: List[str]) -> list:
         """Identify missing information in the report"""
         missing = []
         
@@ -200,7 +596,6 @@ class DDRGenerator:
             missing.append("Inspector name")
         
         # Check for areas with no thermal data
-        no_thermal = [area.area_name for area in report.areas if area.has_issues() and not area.thermal_evidence]
         if no_thermal:
             missing.append(f"Thermal imaging data for: {', '.join(no_thermal)}")
         
@@ -210,98 +605,282 @@ class DDRGenerator:
         
         return missing if missing else ["All key information available"]
     
-    def _call_llm(self, prompt: str) -> str:
-        """Call LLM with prompt and return response"""
-        try:
-            if self.provider == "openai":
-                response = self.client.chat.completions.create(
-                    model=config.api.openai_model,
-                    messages=[
-                        {"role": "system", "content": templates.SYSTEM_PROMPT},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.3,  # Low temperature for factual output
-                    max_tokens=1500
+    def _call_llm(self, prompt: str, instructions: str = "", json_mode: bool = False,
+                  max_tokens: int = 1500, section: Optional[str] = None,
+                  breaker: Optional[_CircuitBreaker] = None) -> str:
+        """
+        Call LLM with prompt and return response, serving repeats from the cache
+        
+        Args:
+            prompt: Per-report data for the section
+            instructions: Static section instructions, appended to the system prompt
+            json_mode: Ask the provider for a JSON object response
+            max_tokens: Output token budget
+            section: Report section key, selecting its token budget and any
+                per-section model override
+            breaker: The report's circuit breaker; providers it has opened
+                are not called
+        """
+        if section is not None:
+            max_tokens = _SECTION_MAX_TOKENS.get(section, max_tokens)
+        
+        # Static text first and identical across reports, so providers can
+        # reuse their cached prefix; only the trailing data varies
+        system_prompt = self._system_prompts.get(instructions)
+        if system_prompt is None:
+            system_prompt = f"{templates.SYSTEM_PROMPT}\n{instructions}"
+        
+        # Responses are cached per provider that answered; any configured
+        # provider's answer serves a repeat, preferred providers first
+        providers = self._provider_order()
+        if self.cache is not None:
+            for provider in providers:
+                cached = self.cache.get(
+                    self._cache_namespace(provider, system_prompt, json_mode, max_tokens, section),
+                    prompt
                 )
-                return response.choices[0].message.content.strip()
-            
-            elif self.provider == "gemini":
-                # Use direct REST API to bypass library version issues
-                import requests
-                
-                api_key = config.api.gemini_api_key
-                # Use gemini-pro on v1 endpoint (most compatible)
-                url = f"https://generativelanguage.googleapis.com/v1/models/gemini-pro:generateContent?key={api_key}"
-                
-                # Include system instruction in the prompt
-                full_prompt = f"{templates.SYSTEM_PROMPT}\n\n{prompt}"
-                
-                payload = {
-                    "contents": [{
-                        "parts": [{"text": full_prompt}]
-                    }],
-                    "generationConfig": {
-                        "temperature": 0.3,
-                        "maxOutputTokens": 1500
-                    }
-                }
-                
-                response = requests.post(url, json=payload, timeout=60)
-                response.raise_for_status()
+                if cached is not None:
+                    return cached
+        
+        if breaker is not None:
+            providers = [provider for provider in providers if not breaker.is_open(provider)]
+            if not providers:
+                return f"{LLM_ERROR_MARKER}: LLM provider unavailable, skipped after repeated failures]"
+        
+        response = None
+        for i, provider in enumerate(providers):
+            try:
+                start = time.perf_counter()
+                response = self._request_with_retries(
+                    provider, prompt, system_prompt, json_mode, max_tokens, section, breaker
+                )
+                self._record_latency(provider, time.perf_counter() - start)
+                break
+            except Exception as e:
+                # Fail over only on transient errors (rate limits, 5xx, timeouts)
+                # or a provider the breaker has given up on
+                if i + 1 < len(providers) and (isinstance(e, _CircuitOpenError) or self._is_retryable(e)):
+                    print(f"Warning: {provider} unavailable ({e}), falling back to {providers[i + 1]}")
+                    continue
                 
-                result = response.json()
-                return result['candidates'][0]['content']['parts'][0]['text'].strip()
-            
-            elif self.provider == "ollama":
-                import requests
-                response = requests.post(
-                    f"{config.api.ollama_endpoint}/api/generate",
-                    json={
-                        "model": config.api.ollama_model,
-                        "prompt": f"{templates.SYSTEM_PROMPT}\n\n{prompt}",
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.3
-                        }
-                    }
+                print(f"Warning: LLM call failed: {e}")
+                return f"{LLM_ERROR_MARKER}: {str(e)}]"
+        
+        # Only successful responses are cached
+        if self.cache is not None and response:
+            try:
+                self.cache.set(
+                    self._cache_namespace(provider, system_prompt, json_mode, max_tokens, section),
+                    prompt, response
+                )
+            except OSError as e:
+                print(f"Warning: could not cache LLM response: {e}")
+        
+        return response
+    
+    def _request_with_retries(self, provider: str, prompt: str, system_prompt: str,
+                              json_mode: bool, max_tokens: int, section: Optional[str] = None,
+                              breaker: Optional[_CircuitBreaker] = None) -> str:
+        """
+        Call one provider, retrying transient errors with jittered exponential backoff
+        
+        The breaker is checked before every attempt, so concurrent calls stop
+        retrying as soon as the report's failures reach the threshold.
+        """
+        for attempt in range(LLM_MAX_ATTEMPTS):
+            if breaker is not None and breaker.is_open(provider):
+                raise _CircuitOpenError(f"{provider} skipped after repeated failures")
+            try:
+                response = self._request_llm(prompt, system_prompt, json_mode, max_tokens, provider, section)
+            except Exception as e:
+                if breaker is not None:
+                    breaker.record(provider, succeeded=False)
+                if attempt + 1 < LLM_MAX_ATTEMPTS and self._is_retryable(e):
+                    delay = min(LLM_BACKOFF_MAX, LLM_BACKOFF_INITIAL * 2 ** attempt)
+                    time.sleep(delay + random.uniform(0, LLM_BACKOFF_INITIAL))
+                    continue
+                raise
+            if breaker is not None:
+                breaker.record(provider, succeeded=True)
+            return response
+    
+    def _section_model(self, provider: str, section: Optional[str]) -> Optional[str]:
+        """Model override configured for a section on a provider, if any"""
+        if section is None:
+            return None
+        return config.api.section_models.get(provider, {}).get(section)
+    
+    def _is_retryable(self, error: Exception) -> bool:
+        """Whether an LLM call error is transient (timeouts, connection drops, 429/5xx)"""
+        if isinstance(error, (requests.Timeout, requests.ConnectionError, TimeoutError, ConnectionError)):
+            return True
+        
+        # requests.HTTPError carries the response; OpenAI errors expose status_code
+        status = getattr(error, "status_code", None)
+        if status is None:
+            status = getattr(getattr(error, "response", None), "status_code", None)
+        if status is not None:
+            return status in RETRYABLE_STATUS_CODES
+        
+        # OpenAI client timeouts and connection errors
+        return type(error).__name__ in ("APITimeoutError", "APIConnectionError")
+    
+    def _request_llm(self, prompt: str, system_prompt: str, json_mode: bool = False,
+                     max_tokens: int = 1500, provider: Optional[str] = None,
+                     section: Optional[str] = None) -> str:
+        """Send the prompt to a provider, the configured one by default (errors propagate)"""
+        provider = provider or self.provider
+        section_model = self._section_model(provider, section)
+        
+        if provider == "openai":
+            extra_args = {"response_format": {"type": "json_object"}} if json_mode else {}
+            response = self._client_for(provider).chat.completions.create(
+                model=section_model or config.api.openai_model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,  # Low temperature for factual output
+                max_tokens=max_tokens,
+                # One key per section routes its requests to the same prompt cache
+                extra_body={"prompt_cache_key": hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:32]},
+                stream=self.on_token is not None,
+                **extra_args
+            )
+            if self.on_token is not None:
+                return self._collect_stream(
+                    (chunk.choices[0].delta.content for chunk in response if chunk.choices), section
                 )
-                response.raise_for_status()
-                return response.json()['response'].strip()
+            return response.choices[0].message.content.strip()
+        
+        elif provider == "gemini":
+            # Use direct REST API to bypass library version issues
+            api_key = config.api.gemini_api_key
+            # v1 endpoint (most compatible); gemini-pro unless configured otherwise
+            model = section_model or config.api.gemini_model
+            url = f"https://generativelanguage.googleapis.com/v1/models/{model}:generateContent?key={api_key}"
+            if self.on_token is not None:
+                url = f"https://generativelanguage.googleapis.com/v1/models/{model}:streamGenerateContent?alt=sse&key={api_key}"
             
-            elif self.provider == "groq":
-                # Groq API (fast and reliable!)
-                import requests
-                
-                api_key = config.api.groq_api_key
-                url = "https://api.groq.com/openai/v1/chat/completions"
-                
-                headers = {
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json"
-                }
-                
-                payload = {
-                    "model": config.api.groq_model,
-                    "messages": [
-                        {"role": "system", "content": templates.SYSTEM_PROMPT},
-                        {"role": "user", "content": prompt}
-                    ],
+            # Include system instruction in the prompt
+            full_prompt = self._preamble(system_prompt) + prompt
+            
+            payload = {
+                "contents": [{
+                    "parts": [{"text": full_prompt}]
+                }],
+                "generationConfig": {
                     "temperature": 0.3,
-                    "max_tokens": 1500
+                    "maxOutputTokens": max_tokens
                 }
-                
-                response = requests.post(url, json=payload, headers=headers, timeout=60)
-                response.raise_for_status()
-                
-                result = response.json()
-                return result['choices'][0]['message']['content'].strip()
+            }
+            
+            response = self._post_json(url, payload, timeout=60, stream=self.on_token is not None)
+            response.raise_for_status()
+            
+            if self.on_token is not None:
+                return self._collect_stream((
+                    part.get('text')
+                    for event in self._iter_sse(response)
+                    for candidate in event.get('candidates', [])[:1]
+                    for part in candidate.get('content', {}).get('parts', [])
+                ), section)
             
-        except Exception as e:
-            print(f"Warning: LLM call failed: {e}")
-            return f"[Error generating this section: {str(e)}]"
+            result = _json_loads(response.content)
+            return result['candidates'][0]['content']['parts'][0]['text'].strip()
+        
+        elif provider == "ollama":
+            response = self._post_json(
+                f"{config.api.ollama_endpoint}/api/generate",
+                {
+                    "model": section_model or config.api.ollama_model,
+                    "prompt": self._preamble(system_prompt) + prompt,
+                    "stream": self.on_token is not None,
+                    "options": {
+                        "temperature": 0.3,
+                        "num_predict": max_tokens
+                    },
+                    **({"format": "json"} if json_mode else {})
+                },
+                stream=self.on_token is not None
+            )
+            response.raise_for_status()
+            
+            if self.on_token is not None:
+                # Newline-delimited JSON objects, one per chunk
+                return self._collect_stream(
+                    (_json_loads(line).get('response') for line in response.iter_lines() if line), section
+                )
+            return _json_loads(response.content)['response'].strip()
+        
+        elif provider == "groq":
+            # Groq API (fast and reliable!)
+            api_key = config.api.groq_api_key
+            url = "https://api.groq.com/openai/v1/chat/completions"
+            
+            headers = {
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            }
+            
+            payload = {
+                "model": section_model or config.api.groq_model,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                "temperature": 0.3,
+                "max_tokens": max_tokens
+            }
+            if json_mode:
+                payload["response_format"] = {"type": "json_object"}
+            if self.on_token is not None:
+                payload["stream"] = True
+            
+            response = self._post_json(
+                url, payload, headers=headers, timeout=60, stream=self.on_token is not None
+            )
+            response.raise_for_status()
+            
+            if self.on_token is not None:
+                return self._collect_stream((
+                    choice.get('delta', {}).get('content')
+                    for event in self._iter_sse(response)
+                    for choice in event.get('choices', [])[:1]
+                ), section)
+            
+            result = _json_loads(response.content)
+            return result['choices'][0]['message']['content'].strip()
+    
+    def _preamble(self, system_prompt: str) -> str:
+        """System prompt with its separator, for providers that take a single prompt string"""
+        preamble = self._preambles.get(system_prompt)
+        return preamble if preamble is not None else f"{system_prompt}\n\n"
+    
+    def _iter_sse(self, response) -> Iterator[dict]:
+        """Yield the JSON payloads of a server-sent events stream"""
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            yield _json_loads(data)
+    
+    def _collect_stream(self, chunks: Iterable[Optional[str]], section: Optional[str] = None) -> str:
+        """Forward streamed text chunks of a section to on_token and return the joined response"""
+        section_key = section or ""
+        parts = []
+        for chunk in chunks:
+            if chunk:
+                self.on_token(section_key, chunk)
+                parts.append(chunk)
+        return "".join(parts).strip()
     
     def export_to_markdown(self, report: DDRReport, output_path: str):
         """Export report to markdown file"""
+        formatted = self._formatted(report)
+        
         # Format severity assessment
         severity_info = ""
         if report.severity_assessment:
@@ -310,9 +889,9 @@ class DDRGenerator:
                 "overall_severity": sev.overall_severity,
                 "severity_score": sev.severity_score,
                 "severity_reasoning": sev.reasoning,
-                "high_priority_list": templates.format_priority_list(sev.high_priority_areas),
-                "medium_priority_list": templates.format_priority_list(sev.medium_priority_areas),
-                "low_priority_list": templates.format_priority_list(sev.low_priority_areas)
+                "high_priority_list": formatted["high_priority"],
+                "medium_priority_list": formatted["medium_priority"],
+                "low_priority_list": formatted["low_priority"]
             }
         else:
             severity_info = {
@@ -324,9 +903,10 @@ class DDRGenerator:
                 "low_priority_list": "Not Available"
             }
         
-        # Generate final report
-        final_report = templates.DDR_REPORT_TEMPLATE.format(
-            property_info=templates.format_property_details(report.property_details),
+        # Render the report and write it piece by piece, so the full
+        # document is never held in memory as one string
+        pieces = templates.iter_ddr_report(
+            property_info=formatted["property_details"],
             property_summary=report.property_issue_summary or "Not Available",
             area_observations=report.area_wise_observations or "Not Available",
             root_cause_analysis=report.probable_root_cause or "Not Available",
@@ -336,10 +916,9 @@ class DDRGenerator:
             generation_timestamp=report.generated_at.strftime("%Y-%m-%d %H:%M:%S"),
             **severity_info
         )
-        
-        # Write to file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(final_report)
+        with open(output_path, "w", encoding="utf-8") as f:
+            for piece in pieces:
+                f.write(piece)
         
         print(f"\nReport exported to: {output_path}")
     
@@ -0,0 +1,81 @@
+"""
+Response cache for LLM calls.
+Responses are stored on disk, one JSON file per exact (namespace, prompt) pair.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class ResponseCache:
+    """Exact-match on-disk cache of LLM responses"""
+    
+    def __init__(self, cache_dir: Path, ttl_seconds: int = 7 * 86400):
+        """
+        Initialize response cache
+        
+        Args:
+            cache_dir: Directory holding one JSON file per cached response
+            ttl_seconds: Age after which entries are ignored
+        """
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+    
+    def _key(self, namespace: str, prompt: str) -> str:
+        """Cache key for a prompt within a namespace (provider, model, system prompt)"""
+        return hashlib.sha256(f"{namespace}\x00{prompt}".encode("utf-8")).hexdigest()
+    
+    def _read(self, path: Path) -> Optional[dict]:
+        """Load an entry, ignoring unreadable or expired files"""
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if time.time() - entry.get("created", 0) > self.ttl_seconds:
+            return None
+        return entry
+    
+    def get(self, namespace: str, prompt: str) -> Optional[str]:
+        """
+        Look up a cached response
+        
+        Args:
+            namespace: Provider/model/system-prompt identity
+            prompt: User prompt
+        
+        Returns:
+            Cached response, or None on a miss
+        """
+        entry = self._read(self.cache_dir / f"{self._key(namespace, prompt)}.json")
+        return entry["response"] if entry is not None else None
+    
+    def set(self, namespace: str, prompt: str, response: str):
+        """
+        Store a response
+        
+        Args:
+            namespace: Provider/model/system-prompt identity
+            prompt: User prompt
+            response: LLM response text
+        """
+        entry = {
+            "namespace": namespace,
+            "prompt": prompt,
+            "response": response,
+            "created": time.time(),
+        }
+        
+        # Write-then-rename so concurrent readers never see a partial file
+        path = self.cache_dir / f"{self._key(namespace, prompt)}.json"
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
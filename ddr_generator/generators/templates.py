@@ -3,6 +3,9 @@ DDR report templates and prompts for LLM-based generation.
 Defines structured templates for each report section.
 """
 
+from string import Formatter
+from typing import Iterator
+
 
 # System prompt for LLM
 SYSTEM_PROMPT = """You are a structural diagnostic report generator for property inspections.
@@ -28,9 +31,22 @@ Your output should help property owners understand:
 
 
 # Section-specific prompts
-PROPERTY_SUMMARY_PROMPT = """Generate a concise Property Issue Summary (2-3 paragraphs) based on this data:
+# Each section is split into static instructions, sent after SYSTEM_PROMPT as
+# part of the system message, and a data-only prompt formatted per report.
+# Keeping every per-report field at the end leaves a byte-identical prefix
+# that providers can serve from their prompt caches.
+PROPERTY_SUMMARY_INSTRUCTIONS = """Generate a concise Property Issue Summary (2-3 paragraphs) based on the data provided.
+
+Create an executive summary that:
+1. Introduces the property and inspection scope
+2. Summarizes the main issues found
+3. Highlights the most critical concerns
+4. Sets context for detailed observations
+
+Use client-friendly language. If any data is missing, write "Not Available" for that specific item."""
 
-Property Details:
+
+PROPERTY_SUMMARY_PROMPT = """Property Details:
 {property_details}
 
 Areas Affected ({num_areas}):
@@ -40,20 +56,10 @@ Severity Assessment:
 {severity_info}
 
 Root Causes Identified:
-{root_causes}
-
-Create an executive summary that:
-1. Introduces the property and inspection scope
-2. Summarizes the main issues found
-3. Highlights the most critical concerns
-4. Sets context for detailed observations
-
-Use client-friendly language. If any data is missing, write "Not Available" for that specific item."""
-
+{root_causes}"""
 
-AREA_OBSERVATIONS_PROMPT = """Generate detailed Area-wise Observations based on this structured data:
 
-{area_data}
+AREA_OBSERVATIONS_INSTRUCTIONS = """Generate detailed Area-wise Observations based on the structured data provided.
 
 For each area, provide:
 1. Area name as heading
@@ -68,16 +74,10 @@ Use specific details from the data - do not generalize or add information not pr
 If an area has no data, do not include it."""
 
 
-ROOT_CAUSE_PROMPT = """Generate a Probable Root Cause Analysis based on this correlation data:
+AREA_OBSERVATIONS_PROMPT = """{area_data}"""
 
-Identified Root Causes:
-{root_causes_data}
 
-Cross-Area Correlations:
-{cross_area_links}
-
-Conflicts Detected:
-{conflicts}
+ROOT_CAUSE_INSTRUCTIONS = """Generate a Probable Root Cause Analysis based on the correlation data provided.
 
 Provide:
 1. Main root causes with supporting evidence
@@ -89,21 +89,17 @@ Explain technical correlations in simple terms (e.g., "bathroom tile gaps allowi
 If conflicts exist, clearly state them as "Conflicting Information: [describe conflict]"."""
 
 
-RECOMMENDED_ACTIONS_PROMPT = """Generate Recommended Actions based on severity assessment and root causes:
+ROOT_CAUSE_PROMPT = """Identified Root Causes:
+{root_causes_data}
 
-Severity Level: {overall_severity}
+Cross-Area Correlations:
+{cross_area_links}
 
-High Priority Areas:
-{high_priority}
+Conflicts Detected:
+{conflicts}"""
 
-Medium Priority Areas:
-{medium_priority}
 
-Low Priority Areas:
-{low_priority}
-
-Root Causes:
-{root_causes}
+RECOMMENDED_ACTIONS_INSTRUCTIONS = """Generate Recommended Actions based on the severity assessment and root causes provided.
 
 Provide prioritized recommendations:
 1. **Immediate Actions** (for HIGH severity issues)
@@ -115,9 +111,22 @@ Include general advice like "Consult a licensed professional" where appropriate.
 Do not recommend specific contractors or products."""
 
 
-MISSING_INFO_PROMPT = """Review the following report data and identify any missing or unclear information:
+RECOMMENDED_ACTIONS_PROMPT = """Severity Level: {overall_severity}
 
-{report_data_summary}
+High Priority Areas:
+{high_priority}
+
+Medium Priority Areas:
+{medium_priority}
+
+Low Priority Areas:
+{low_priority}
+
+Root Causes:
+{root_causes}"""
+
+
+MISSING_INFO_INSTRUCTIONS = """Review the report data provided and identify any missing or unclear information.
 
 List any information that was:
 1. Not available in source documents
@@ -127,6 +136,28 @@ List any information that was:
 Be specific about what is missing. If everything is complete, write "All key information available"."""
 
 
+MISSING_INFO_PROMPT = """{report_data_summary}"""
+
+
+COMBINED_SECTIONS_INSTRUCTIONS = f"""Generate several report sections at once. The data for each section follows a "## <section_key>" heading.
+
+Return ONLY a JSON object whose keys are the section keys present in the data and whose values are the section texts as markdown strings.
+
+Instructions per section:
+
+### property_summary
+{PROPERTY_SUMMARY_INSTRUCTIONS}
+
+### area_observations
+{AREA_OBSERVATIONS_INSTRUCTIONS}
+
+### root_cause_analysis
+{ROOT_CAUSE_INSTRUCTIONS}
+
+### recommended_actions
+{RECOMMENDED_ACTIONS_INSTRUCTIONS}"""
+
+
 # Template for final DDR report
 DDR_REPORT_TEMPLATE = """# Detailed Diagnostic Report (DDR)
 
@@ -191,6 +222,37 @@ DDR_REPORT_TEMPLATE = """# Detailed Diagnostic Report (DDR)
 """
 
 
+# Bound formatters, resolved once at import rather than per report
+format_property_summary_prompt = PROPERTY_SUMMARY_PROMPT.format
+format_area_observations_prompt = AREA_OBSERVATIONS_PROMPT.format
+format_root_cause_prompt = ROOT_CAUSE_PROMPT.format
+format_recommended_actions_prompt = RECOMMENDED_ACTIONS_PROMPT.format
+format_ddr_report = DDR_REPORT_TEMPLATE.format
+
+# Literal text and replacement fields of the report template, parsed once
+_DDR_REPORT_PARTS = tuple(Formatter().parse(DDR_REPORT_TEMPLATE))
+
+
+def iter_ddr_report(**fields) -> Iterator[str]:
+    """
+    Render the report template piece by piece
+    
+    Joining the pieces gives the same text as format_ddr_report, but a
+    writer can emit them one at a time without building the whole report.
+    
+    Args:
+        **fields: Template field values
+    
+    Returns:
+        Iterator over literal template text and formatted field values
+    """
+    for literal, field_name, format_spec, _ in _DDR_REPORT_PARTS:
+        if literal:
+            yield literal
+        if field_name is not None:
+            yield format(fields[field_name], format_spec)
+
+
 def format_property_details(property_details) -> str:
     """Format property details for display"""
     parts = []
@@ -213,32 +275,27 @@ def format_property_details(property_details) -> str:
 
 
 def format_area_data(areas) -> str:
-    """Format area observations for LLM prompt"""
+    """Format area observations for LLM prompt (areas already filtered to those with issues)"""
     formatted = []
     
     for area in areas:
-        if not area.has_issues():
-            continue
-        
-        area_text = f"\n### {area.area_name}\n"
+        parts = [f"\n### {area.area_name}\n"]
         
         if area.negative_findings:
-            area_text += "**Issues Found:**\n"
-            for finding in area.negative_findings:
-                area_text += f"- {finding}\n"
+            parts.append("**Issues Found:**\n")
+            parts.extend(f"- {finding}\n" for finding in area.negative_findings)
         
         if area.positive_findings:
-            area_text += "**Probable Causes:**\n"
-            for finding in area.positive_findings:
-                area_text += f"- {finding}\n"
+            parts.append("**Probable Causes:**\n")
+            parts.extend(f"- {finding}\n" for finding in area.positive_findings)
         
         if area.thermal_evidence:
-            area_text += f"**Thermal Evidence:** {area.thermal_evidence.summary()}\n"
+            parts.append(f"**Thermal Evidence:** {area.thermal_evidence.summary()}\n")
         
         if area.severity:
-            area_text += f"**Severity:** {area.severity}\n"
+            parts.append(f"**Severity:** {area.severity}\n")
         
-        formatted.append(area_text)
+        formatted.append("".join(parts))
     
     return "\n".join(formatted) if formatted else "No significant issues detected"
 
@@ -250,16 +307,17 @@ def format_root_causes(root_causes) -> str:
     
     formatted = []
     for i, cause in enumerate(root_causes, 1):
-        cause_text = f"\n**{i}. {cause.cause_description}**\n"
-        cause_text += f"- **Affected Areas:** {', '.join(cause.affected_areas)}\n"
-        cause_text += f"- **Confidence:** {cause.confidence}\n"
+        parts = [
+            f"\n**{i}. {cause.cause_description}**\n",
+            f"- **Affected Areas:** {', '.join(cause.affected_areas)}\n",
+            f"- **Confidence:** {cause.confidence}\n",
+        ]
         
         if cause.supporting_evidence:
-            cause_text += "- **Evidence:**\n"
-            for evidence in cause.supporting_evidence[:3]:  # Limit to top 3
-                cause_text += f"  - {evidence}\n"
+            parts.append("- **Evidence:**\n")
+            parts.extend(f"  - {evidence}\n" for evidence in cause.supporting_evidence[:3])  # Limit to top 3
         
-        formatted.append(cause_text)
+        formatted.append("".join(parts))
     
     return "\n".join(formatted)
 
@@ -3,10 +3,15 @@ Main pipeline orchestrator for DDR generation.
 Coordinates all modules to generate complete reports from PDFs.
 """
 
+import multiprocessing
 import os
+import queue
 import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 
 # Add parent directory to path to allow direct execution
@@ -48,6 +53,28 @@ except ImportError:
     from ddr_generator.config import config
 
 
+def _write_lines(*lines: str):
+    """Write progress lines to stdout in a single call, so concurrent runs don't interleave them"""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+
+def _extract_pair(inspection_pdf_path: str, thermal_pdf_path: Optional[str] = None):
+    """
+    Extract inspection data and, if given, thermal data
+    
+    Module-level so it can run in a worker process: PyMuPDF is not
+    thread-safe, so PDFs are parsed in parallel only across processes.
+    """
+    with InspectionParser(inspection_pdf_path) as parser:
+        inspection_result = parser.parse()
+    thermal_data = {}
+    if thermal_pdf_path:
+        with ThermalParser(thermal_pdf_path) as parser:
+            thermal_data = parser.parse()
+    return inspection_result, thermal_data
+
+
 class DDRPipeline:
     """Main pipeline for DDR generation"""
     
@@ -67,8 +94,19 @@ class DDRPipeline:
         self.deduplicator = Deduplicator() if enable_deduplication else None
         self.correlator = CorrelationEngine()
         self.severity_engine = SeverityEngine()
-        self.generator = DDRGenerator(llm_provider)
         self.enable_deduplication = enable_deduplication
+        
+        # LLM client set up on first use, so extraction and analysis alone
+        # never pay for it
+        self.llm_provider = llm_provider
+        self._generator = None
+    
+    @property
+    def generator(self) -> DDRGenerator:
+        """LLM report generator, created on first access"""
+        if self._generator is None:
+            self._generator = DDRGenerator(self.llm_provider)
+        return self._generator
     
     def process(
         self,
@@ -87,76 +125,196 @@ class DDRPipeline:
         Returns:
             Complete DDR report
         """
-        print("="*60)
-        print("DDR GENERATION PIPELINE")
-        print("="*60)
+        rule = "=" * 60
+        _write_lines(rule, "DDR GENERATION PIPELINE", rule, "", "[1/7] Extracting data from inspection report...")
         
-        # Step 1: Extract data from PDFs
-        print("\n[1/7] Extracting data from inspection report...")
+        # Step 1: Extract data from PDFs, one after the other: PyMuPDF is not
+        # thread-safe, so the parsers must not run concurrently in one process
         inspection_result = self._extract_inspection_data(inspection_pdf_path)
-        print(f"     ✓ Found {len(inspection_result.raw_negative_findings)} area(s) with issues")
+        lines = [f"     ✓ Found {len(inspection_result.raw_negative_findings)} area(s) with issues", ""]
         
         thermal_data = {}
         if thermal_pdf_path:
-            print("\n[2/7] Extracting thermal data...")
+            _write_lines(*lines, "[2/7] Extracting thermal data...")
             thermal_data = self._extract_thermal_data(thermal_pdf_path)
-            print(f"     ✓ Found thermal data for {len(thermal_data)} area(s)")
+            lines = [f"     ✓ Found thermal data for {len(thermal_data)} area(s)"]
         else:
-            print("\n[2/7] Skipping thermal data (no thermal PDF provided)")
+            lines.append("[2/7] Skipping thermal data (no thermal PDF provided)")
+        
+        report = self._analyze(inspection_result, thermal_data, lines)
+        
+        # Step 6: Generate report sections with LLM
+        _write_lines(*lines, "", "[7/7] Generating report sections with LLM...")
+        report = self.generator.generate_report(report)
+        
+        # Validate report
+        validation = validate_report_completeness(report)
+        lines = [
+            "     ✓ Report generation complete",
+            "",
+            rule,
+            f"Report Quality Score: {validation['score']}/1.0",
+        ]
+        
+        if validation['warnings']:
+            lines += ["", "Warnings:"]
+            lines += [f"  ⚠ {warning}" for warning in validation['warnings']]
+        
+        if validation['issues']:
+            lines += ["", "Issues:"]
+            lines += [f"  ✗ {issue}" for issue in validation['issues']]
+        _write_lines(*lines)
+        
+        # Export reports
+        if output_dir:
+            self.export_reports(report, output_dir, inspection_pdf_path)
+        
+        _write_lines("", rule, "PIPELINE COMPLETE", rule)
+        
+        return report
+    
+    def _analyze(self, inspection_result, thermal_data: dict,
+                 lines: Optional[List[str]] = None) -> DDRReport:
+        """
+        Structure, deduplicate, correlate and assess extracted data
+        
+        Progress is appended to lines when given (the caller writes it out),
+        otherwise written in one piece at the end.
+        """
+        progress = lines if lines is not None else []
         
         # Step 2: Structure data
-        print("\n[3/7] Structuring data...")
         report = self.structurer.structure_data(inspection_result, thermal_data)
         report = self.structurer.merge_similar_areas(report)
-        print(f"     ✓ Structured {len(report.areas)} unique area(s)")
+        progress += ["", "[3/7] Structuring data...", f"     ✓ Structured {len(report.areas)} unique area(s)"]
         
         # Step 3: Deduplicate findings
         if self.enable_deduplication and self.deduplicator:
-            print("\n[4/7] Deduplicating findings...")
             report = self._deduplicate_report(report)
-            print("     ✓ Deduplication complete")
+            progress += ["", "[4/7] Deduplicating findings...", "     ✓ Deduplication complete"]
         else:
-            print("\n[4/7] Skipping deduplication")
+            progress += ["", "[4/7] Skipping deduplication"]
         
         # Step 4: Correlation analysis
-        print("\n[5/7] Performing correlation analysis...")
         report.correlation_result = self.correlator.correlate(report)
-        print(f"     ✓ Identified {len(report.correlation_result.root_causes)} root cause(s)")
+        progress += [
+            "", "[5/7] Performing correlation analysis...",
+            f"     ✓ Identified {len(report.correlation_result.root_causes)} root cause(s)",
+        ]
         
         # Step 5: Severity assessment
-        print("\n[6/7] Assessing severity...")
         report.severity_assessment = self.severity_engine.assess_severity(report)
-        print(f"     ✓ Overall severity: {report.severity_assessment.overall_severity}")
+        progress += [
+            "", "[6/7] Assessing severity...",
+            f"     ✓ Overall severity: {report.severity_assessment.overall_severity}",
+        ]
         
-        # Step 6: Generate report sections with LLM
-        print("\n[7/7] Generating report sections with LLM...")
-        report = self.generator.generate_report(report)
-        print("     ✓ Report generation complete")
+        if lines is None:
+            _write_lines(*progress)
+        return report
+    
+    def process_many(
+        self,
+        paths: List[Tuple[str, Optional[str]]],
+        output_dir: Optional[str] = None,
+        batch_size: int = 8,
+        max_wait_ms: int = 500
+    ) -> List[Optional[DDRReport]]:
+        """
+        Process several (inspection PDF, thermal PDF) pairs as a staged pipeline
         
-        # Validate report
-        print("\n" + "="*60)
-        validation = validate_report_completeness(report)
-        print(f"Report Quality Score: {validation['score']}/1.0")
+        PDFs are extracted in worker processes and analyzed one at a time in a
+        producer thread; analyzed reports are queued and handed to the LLM
+        generator in batches, once batch_size reports are ready or max_wait_ms
+        has passed since the first one was queued.
         
-        if validation['warnings']:
-            print("\nWarnings:")
-            for warning in validation['warnings']:
-                print(f"  ⚠ {warning}")
+        A pair that fails (extraction, analysis, generation or export) is
+        reported and left as None; the other pairs still complete.
         
-        if validation['issues']:
-            print("\nIssues:")
-            for issue in validation['issues']:
-                print(f"  ✗ {issue}")
+        Args:
+            paths: (inspection_pdf_path, thermal_pdf_path or None) pairs
+            output_dir: Output directory for reports (optional); each export
+                is named after its inspection PDF and its position in paths
+            batch_size: Most reports sent to the generator at once
+            max_wait_ms: Longest wait for a batch to fill up
         
-        # Export reports
-        if output_dir:
-            self._export_reports(report, output_dir, inspection_pdf_path)
+        Returns:
+            DDR reports in the order of paths, None for pairs that failed
+        """
+        ready = queue.Queue()
+        done = object()
         
-        print("\n" + "="*60)
-        print("PIPELINE COMPLETE")
-        print("="*60)
+        def produce(extractions):
+            try:
+                for index, future in enumerate(extractions):
+                    try:
+                        ready.put((index, self._analyze(*future.result())))
+                    except Exception as e:
+                        ready.put((index, e))
+            finally:
+                ready.put(done)
         
-        return report
+        def fail(index: int, error: Exception):
+            _write_lines(f"     ✗ {paths[index][0]}: {error}")
+        
+        reports: List[Optional[DDRReport]] = [None] * len(paths)
+        # Spawned (not forked) workers: the parent may already run model threads
+        with ProcessPoolExecutor(
+            max_workers=min(len(paths), 4) or 1,
+            mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            extractions = [
+                executor.submit(_extract_pair, inspection, thermal)
+                for inspection, thermal in paths
+            ]
+            producer = threading.Thread(target=produce, args=(extractions,), daemon=True)
+            producer.start()
+            
+            finished = False
+            while not finished:
+                batch = []
+                item = ready.get()
+                deadline = time.monotonic() + max_wait_ms / 1000
+                while True:
+                    if item is done:
+                        finished = True
+                        break
+                    index, result = item
+                    if isinstance(result, Exception):
+                        fail(index, result)
+                    else:
+                        batch.append(item)
+                    if len(batch) >= batch_size:
+                        break
+                    try:
+                        item = ready.get(timeout=max(deadline - time.monotonic(), 0))
+                    except queue.Empty:
+                        break
+                
+                if not batch:
+                    continue
+                try:
+                    generated = self.generator.generate_report_batch([report for _, report in batch])
+                except Exception as e:
+                    for index, _ in batch:
+                        fail(index, e)
+                    continue
+                for (index, _), report in zip(batch, generated):
+                    try:
+                        if output_dir:
+                            # Numbered, since PDFs in different folders may share a name
+                            self.export_reports(
+                                report, output_dir, paths[index][0],
+                                base_name=f"{Path(paths[index][0]).stem}_{index + 1}"
+                            )
+                    except Exception as e:
+                        fail(index, e)
+                        continue
+                    reports[index] = report
+            
+            producer.join()
+        
+        return reports
     
     def _extract_inspection_data(self, pdf_path: str):
         """Extract data from inspection PDF"""
@@ -179,14 +337,26 @@ class DDRPipeline:
             )
         return report
     
-    def _export_reports(self, report: DDRReport, output_dir: str, inspection_path: str):
-        """Export reports to files"""
+    def export_reports(self, report: DDRReport, output_dir: str, inspection_path: str,
+                       base_name: Optional[str] = None) -> Tuple[Path, Path]:
+        """
+        Export reports to files
+        
+        Args:
+            report: Generated DDR report
+            output_dir: Output directory for reports
+            inspection_path: Inspection PDF the report was generated from
+            base_name: File name prefix (defaults to the inspection PDF's name)
+            
+        Returns:
+            Tuple of (markdown path, JSON path)
+        """
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         
         # Generate filename from timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        base_name = Path(inspection_path).stem
+        base_name = base_name or Path(inspection_path).stem
         
         # Export markdown
         md_path = output_path / f"{base_name}_DDR_{timestamp}.md"
@@ -195,23 +365,30 @@ class DDRPipeline:
         # Export JSON
         json_path = output_path / f"{base_name}_DDR_{timestamp}.json"
         self.generator.export_to_json(report, str(json_path))
+        
+        return md_path, json_path
 
 
 def main():
     """CLI entry point"""
     import argparse
+    import glob
     
     parser = argparse.ArgumentParser(
         description="Generate Detailed Diagnostic Reports from inspection PDFs"
     )
-    parser.add_argument(
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument(
         "--inspection",
-        required=True,
         help="Path to inspection report PDF"
     )
+    inputs.add_argument(
+        "--inspection-glob",
+        help="Glob of inspection report PDFs to process as one batch"
+    )
     parser.add_argument(
         "--thermal",
-        help="Path to thermal report PDF (optional)"
+        help="Path to thermal report PDF (optional, ignored with --inspection-glob)"
     )
     parser.add_argument(
         "--output",
@@ -249,6 +426,28 @@ def main():
         enable_deduplication=not args.no_dedup
     )
     
+    # Process a batch of reports
+    if args.inspection_glob:
+        paths = sorted(glob.glob(args.inspection_glob))
+        if not paths:
+            print(f"No PDFs match {args.inspection_glob}")
+            return
+        try:
+            reports = pipeline.process_many(
+                [(path, None) for path in paths],
+                output_dir=args.output
+            )
+            succeeded = sum(1 for report in reports if report is not None)
+            print(f"\n✓ Successfully generated {succeeded} of {len(reports)} DDR report(s)")
+            for path, report in zip(paths, reports):
+                status = report.severity_assessment.overall_severity if report else "FAILED"
+                print(f"  {Path(path).name}: {status}")
+        except Exception as e:
+            print(f"\n✗ Error: {e}")
+            import traceback
+            traceback.print_exc()
+        return
+    
     # Process reports
     try:
         report = pipeline.process(
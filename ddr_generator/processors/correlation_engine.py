@@ -3,19 +3,179 @@ Correlation engine: Links observations across areas and identifies root causes.
 Implements rule-based correlation patterns.
 """
 
-from typing import List, Dict, Tuple
+import sys
+from typing import List, Dict, Tuple, FrozenSet
+from itertools import combinations
 import re
 from ..schemas import DDRReport, RootCause, CorrelationResult, AreaObservation
 from ..config import config
 
+try:
+    # Aho-Corasick automaton for multi-keyword scans, when installed
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+# Statements indicating good or bad condition, checked for contradictions
+_POSITIVE_INDICATORS = ("no issue", "no damage", "good condition", "satisfactory")
+_NEGATIVE_INDICATORS = ("severe", "critical", "major", "significant")
+
+# Areas sharing one of these keywords are considered potentially adjacent
+_SHARED_AREA_KEYWORDS = ("bedroom", "bathroom", "hall", "kitchen")
+
+# Role an adjacent area plays for each adjacency tag role
+_MIRRORED_ROLES = {"area": "adjacent", "adjacent": "area", "shared": "shared"}
+
 
 class CorrelationEngine:
     """Correlates findings across areas to identify root causes"""
     
+    __slots__ = (
+        "correlation_config", "correlation_patterns", "adjacent_areas",
+        "_keyword_bits", "_pattern_masks", "_positive_indicator_mask",
+        "_negative_indicator_mask", "_automaton", "_keyword_re",
+        # Per-report state, filled by _prepare
+        "_area_lower", "_negative_masks", "_positive_masks",
+        "_negative_area_masks", "_positive_area_masks", "_area_masks",
+        "_negative_areas", "_positive_areas",
+        "_area_tags", "_adjacency_targets", "_group_to_areas",
+        "_adjacent_index_pairs", "_neighbours",
+    )
+    
     def __init__(self):
         self.correlation_config = config.correlation
         self.correlation_patterns = self.correlation_config.patterns
         self.adjacent_areas = self.correlation_config.adjacent_areas
+        
+        # One bit per distinct keyword across all patterns and indicators
+        keywords = []
+        for negative_pattern, positive_pattern, _ in self.correlation_patterns:
+            keywords.extend(negative_pattern.lower().split())
+            keywords.extend(positive_pattern.lower().split())
+        keywords.extend(_POSITIVE_INDICATORS)
+        keywords.extend(_NEGATIVE_INDICATORS)
+        self._keyword_bits = {keyword: 1 << i for i, keyword in enumerate(dict.fromkeys(keywords))}
+        
+        # A pattern matches when every one of its keyword bits is set
+        self._pattern_masks = [
+            (self._mask_of(negative_pattern.lower().split()),
+             self._mask_of(positive_pattern.lower().split()),
+             sys.intern(root_cause_desc))
+            for negative_pattern, positive_pattern, root_cause_desc in self.correlation_patterns
+        ]
+        
+        self._positive_indicator_mask = self._mask_of(_POSITIVE_INDICATORS)
+        self._negative_indicator_mask = self._mask_of(_NEGATIVE_INDICATORS)
+        
+        # Finds every keyword in a single pass over the text
+        self._automaton = None
+        self._keyword_re = None
+        if ahocorasick is None:
+            # Without the automaton, one regex pass screens out text with no
+            # keyword at all before the per-keyword substring tests
+            self._keyword_re = re.compile("|".join(map(re.escape, self._keyword_bits)))
+        else:
+            self._automaton = ahocorasick.Automaton()
+            for keyword, bit in self._keyword_bits.items():
+                self._automaton.add_word(keyword, bit)
+            self._automaton.make_automaton()
+    
+    def _mask_of(self, keywords: List[str]) -> int:
+        """Bitmask of a set of known keywords"""
+        mask = 0
+        for keyword in keywords:
+            mask |= self._keyword_bits[keyword]
+        return mask
+    
+    def _keyword_mask(self, text_lower: str) -> int:
+        """Bitmask of the keywords contained in lowercased text"""
+        mask = 0
+        automaton = self._automaton
+        if automaton is not None:
+            for _, bit in automaton.iter(text_lower):
+                mask |= bit
+        elif self._keyword_re.search(text_lower) is not None:
+            for keyword, bit in self._keyword_bits.items():
+                if keyword in text_lower:
+                    mask |= bit
+        return mask
+    
+    @staticmethod
+    def _union(masks: List[int]) -> int:
+        """Bitwise OR of keyword masks"""
+        union = 0
+        for mask in masks:
+            union |= mask
+        return union
+    
+    def _prepare(self, areas: List[AreaObservation]) -> None:
+        """Lowercase and keyword-scan every area name and finding once per report"""
+        keyword_mask = self._keyword_mask
+        self._area_lower = [area.area_name.lower() for area in areas]
+        self._negative_masks = [
+            [keyword_mask(finding.lower()) for finding in area.negative_findings]
+            for area in areas
+        ]
+        self._positive_masks = [
+            [keyword_mask(finding.lower()) for finding in area.positive_findings]
+            for area in areas
+        ]
+        
+        # Areas with any negative / positive findings; most areas have only one kind
+        self._negative_areas = [i for i, area in enumerate(areas) if area.negative_findings]
+        self._positive_areas = [i for i, area in enumerate(areas) if area.positive_findings]
+        
+        # Union of each area's finding keywords: a pattern can only match a
+        # finding of the area if all its bits are in the union
+        self._negative_area_masks = [self._union(masks) for masks in self._negative_masks]
+        self._positive_area_masks = [self._union(masks) for masks in self._positive_masks]
+        self._area_masks = [
+            negative | positive
+            for negative, positive in zip(self._negative_area_masks, self._positive_area_masks)
+        ]
+        
+        # Adjacency tags, and the tags an adjacent area would carry
+        self._area_tags = [self._area_tags_of(name) for name in self._area_lower]
+        self._adjacency_targets = [
+            frozenset((_MIRRORED_ROLES[role], group) for role, group in tags)
+            for tags in self._area_tags
+        ]
+        
+        # Areas can only be adjacent when they share a tag group
+        self._group_to_areas: Dict[Tuple[str, ...], List[int]] = {}
+        for i, tags in enumerate(self._area_tags):
+            for group in dict.fromkeys(group for _, group in tags):
+                self._group_to_areas.setdefault(group, []).append(i)
+        
+        # Adjacent pairs, and each area's adjacent areas in area order
+        self._adjacent_index_pairs = self._adjacent_pairs()
+        self._neighbours: List[List[int]] = [[] for _ in areas]
+        for i, j in self._adjacent_index_pairs:
+            self._neighbours[i].append(j)
+            self._neighbours[j].append(i)
+        for neighbours in self._neighbours:
+            neighbours.sort()
+    
+    def _area_tags_of(self, area_lower: str) -> FrozenSet[Tuple[str, Tuple[str, ...]]]:
+        """
+        Adjacency tags of a lowercased area name
+        
+        Each tag is (role, group): the area names the configured key area
+        ("area") or one of its neighbours ("adjacent") of an adjacency
+        group, or contains a shared keyword ("shared").
+        """
+        tags = set()
+        for key_area, adjacent_list in self.adjacent_areas.items():
+            for adj in adjacent_list:
+                if key_area in area_lower:
+                    tags.add(("area", (key_area, adj)))
+                if adj in area_lower:
+                    tags.add(("adjacent", (key_area, adj)))
+        for keyword in _SHARED_AREA_KEYWORDS:
+            if keyword in area_lower:
+                tags.add(("shared", (keyword,)))
+        return frozenset(tags)
     
     def correlate(self, report: DDRReport) -> CorrelationResult:
         """
@@ -23,7 +183,7 @@ class CorrelationEngine:
         
         Args:
             report: DDR report with area observations
-            
+        
         Returns:
             CorrelationResult with identified root causes and links
         """
@@ -31,14 +191,19 @@ class CorrelationEngine:
         cross_area_links = {}
         conflicts = []
         
+        areas = report.areas
+        self._prepare(areas)
+        find_pattern_matches = self._find_pattern_matches
+        
+        # Every correlation pairs a negative finding with a positive one
+        has_both = bool(self._negative_areas and self._positive_areas)
+        
         # Apply correlation patterns
-        for pattern in self.correlation_patterns:
-            negative_pattern, positive_pattern, root_cause_desc = pattern
-            
-            matches = self._find_pattern_matches(
-                report.areas,
-                negative_pattern,
-                positive_pattern
+        for negative_mask, positive_mask, root_cause_desc in self._pattern_masks if has_both else ():
+            matches = find_pattern_matches(
+                areas,
+                negative_mask,
+                positive_mask
             )
             
             if matches:
@@ -60,9 +225,8 @@ class CorrelationEngine:
                     )
         
         # Check for adjacent area correlations
-        adjacent_correlations = self._find_adjacent_area_correlations(report.areas)
-        for correlation in adjacent_correlations:
-            root_causes.append(correlation)
+        if has_both:
+            root_causes.extend(self._find_adjacent_area_correlations(areas))
         
         # Detect conflicts (contradictory findings)
         conflicts = self._detect_conflicts(report.areas)
@@ -79,87 +243,85 @@ class CorrelationEngine:
     def _find_pattern_matches(
         self,
         areas: List[AreaObservation],
-        negative_pattern: str,
-        positive_pattern: str
+        negative_pattern: int,
+        positive_pattern: int
     ) -> List[Tuple[str, str, str]]:
         """
         Find areas matching both negative and positive patterns
         
+        Args:
+            areas: Report areas, as passed to _prepare
+            negative_pattern: Keyword mask of the negative pattern
+            positive_pattern: Keyword mask of the positive pattern
+        
         Returns:
             List of (area_name, negative_finding, positive_finding) tuples
         """
         matches = []
+        pattern_matches = self._pattern_matches
+        negative_masks = self._negative_masks
+        positive_masks = self._positive_masks
+        neighbours = self._neighbours
+        negative_area_masks = self._negative_area_masks
+        positive_area_masks = self._positive_area_masks
         
-        for area in areas:
-            matching_negatives = [
-                nf for nf in area.negative_findings
-                if self._pattern_matches(nf, negative_pattern)
-            ]
+        # Positive findings matching the pattern, per area, found once and
+        # reused for the same area and for every area adjacent to it
+        matching_positives: List[List[str]] = [[] for _ in areas]
+        for i in self._positive_areas:
+            if pattern_matches(positive_area_masks[i], positive_pattern):
+                matching_positives[i] = [
+                    pf for pf, mask in zip(areas[i].positive_findings, positive_masks[i])
+                    if pattern_matches(mask, positive_pattern)
+                ]
+        
+        for i in self._negative_areas:
+            area = areas[i]
+            if not pattern_matches(negative_area_masks[i], negative_pattern):
+                continue
             
-            matching_positives = [
-                pf for pf in area.positive_findings
-                if self._pattern_matches(pf, positive_pattern)
+            matching_negatives = [
+                nf for nf, mask in zip(area.negative_findings, negative_masks[i])
+                if pattern_matches(mask, negative_pattern)
             ]
+            if not matching_negatives:
+                continue
             
             # If we have both types of matches, it's a correlation
-            if matching_negatives and matching_positives:
-                for neg in matching_negatives:
-                    for pos in matching_positives:
-                        matches.append((area.area_name, neg, pos))
+            for neg in matching_negatives:
+                for pos in matching_positives[i]:
+                    matches.append((area.area_name, neg, pos))
             
             # Also check if positive finding is in an adjacent area
-            for other_area in areas:
+            for j in neighbours[i]:
+                other_area = areas[j]
                 if other_area.area_name == area.area_name:
                     continue
                 
-                if self._are_areas_adjacent(area.area_name, other_area.area_name):
-                    other_positives = [
-                        pf for pf in other_area.positive_findings
-                        if self._pattern_matches(pf, positive_pattern)
-                    ]
-                    
-                    if matching_negatives and other_positives:
-                        for neg in matching_negatives:
-                            for pos in other_positives:
-                                matches.append((
-                                    f"{area.area_name} (adjacent to {other_area.area_name})",
-                                    neg,
-                                    pos
-                                ))
+                for neg in matching_negatives:
+                    for pos in matching_positives[j]:
+                        matches.append((
+                            f"{area.area_name} (adjacent to {other_area.area_name})",
+                            neg,
+                            pos
+                        ))
         
         return matches
     
-    def _pattern_matches(self, text: str, pattern: str) -> bool:
-        """Check if text matches pattern (fuzzy keyword matching)"""
-        text_lower = text.lower()
-        pattern_lower = pattern.lower()
-        
-        # Split pattern into keywords
-        keywords = pattern_lower.split()
-        
-        # Check if all keywords are present
-        return all(keyword in text_lower for keyword in keywords)
+    def _pattern_matches(self, text_mask: int, pattern_mask: int) -> bool:
+        """Check if text contains all pattern keywords (fuzzy keyword matching, on bitmasks)"""
+        return text_mask & pattern_mask == pattern_mask
     
-    def _are_areas_adjacent(self, area1: str, area2: str) -> bool:
-        """Check if two areas are adjacent based on configuration"""
-        area1_lower = area1.lower()
-        area2_lower = area2.lower()
-        
-        for key_area, adjacent_list in self.adjacent_areas.items():
-            if key_area in area1_lower:
-                if any(adj in area2_lower for adj in adjacent_list):
-                    return True
-            if key_area in area2_lower:
-                if any(adj in area1_lower for adj in adjacent_list):
-                    return True
-        
-        # Also consider areas with shared keywords as potentially adjacent
-        shared_keywords = ["bedroom", "bathroom", "hall", "kitchen"]
-        for keyword in shared_keywords:
-            if keyword in area1_lower and keyword in area2_lower:
-                return True
-        
-        return False
+    def _are_areas_adjacent(self, i: int, j: int) -> bool:
+        """Check if two prepared areas are adjacent based on configuration"""
+        return bool(self._adjacency_targets[i] & self._area_tags[j])
+    
+    def _adjacent_pairs(self) -> List[Tuple[int, int]]:
+        """Index pairs (i < j) of adjacent prepared areas, in area order"""
+        candidates = set()
+        for idxs in self._group_to_areas.values():
+            candidates.update(combinations(idxs, 2))
+        return sorted(pair for pair in candidates if self._are_areas_adjacent(*pair))
     
     def _find_adjacent_area_correlations(
         self,
@@ -168,39 +330,37 @@ class CorrelationEngine:
         """Find correlations between adjacent areas"""
         correlations = []
         
-        for i, area in enumerate(areas):
-            for j, other_area in enumerate(areas[i + 1:], start=i + 1):
-                if not self._are_areas_adjacent(area.area_name, other_area.area_name):
-                    continue
+        for i, j in self._adjacent_index_pairs:
+            area, other_area = areas[i], areas[j]
+            
+            # Check if one has positive findings and the other has negative
+            if area.positive_findings and other_area.negative_findings:
+                cause_desc = (
+                    f"Issues in {other_area.area_name} likely caused by "
+                    f"problems identified in adjacent {area.area_name}"
+                )
                 
-                # Check if one has positive findings and the other has negative
-                if area.positive_findings and other_area.negative_findings:
-                    cause_desc = (
-                        f"Issues in {other_area.area_name} likely caused by "
-                        f"problems identified in adjacent {area.area_name}"
-                    )
-                    
-                    root_cause = RootCause(
-                        cause_description=cause_desc,
-                        affected_areas=[area.area_name, other_area.area_name],
-                        supporting_evidence=area.positive_findings + other_area.negative_findings,
-                        confidence="Medium"
-                    )
-                    correlations.append(root_cause)
+                root_cause = RootCause(
+                    cause_description=cause_desc,
+                    affected_areas=[area.area_name, other_area.area_name],
+                    supporting_evidence=area.positive_findings + other_area.negative_findings,
+                    confidence="Medium"
+                )
+                correlations.append(root_cause)
+            
+            elif other_area.positive_findings and area.negative_findings:
+                cause_desc = (
+                    f"Issues in {area.area_name} likely caused by "
+                    f"problems identified in adjacent {other_area.area_name}"
+                )
                 
-                elif other_area.positive_findings and area.negative_findings:
-                    cause_desc = (
-                        f"Issues in {area.area_name} likely caused by "
-                        f"problems identified in adjacent {other_area.area_name}"
-                    )
-                    
-                    root_cause = RootCause(
-                        cause_description=cause_desc,
-                        affected_areas=[area.area_name, other_area.area_name],
-                        supporting_evidence=other_area.positive_findings + area.negative_findings,
-                        confidence="Medium"
-                    )
-                    correlations.append(root_cause)
+                root_cause = RootCause(
+                    cause_description=cause_desc,
+                    affected_areas=[area.area_name, other_area.area_name],
+                    supporting_evidence=other_area.positive_findings + area.negative_findings,
+                    confidence="Medium"
+                )
+                correlations.append(root_cause)
         
         return correlations
     
@@ -211,7 +371,7 @@ class CorrelationEngine:
         confidence: str
     ) -> RootCause:
         """Create RootCause object from matches"""
-        affected_areas = list(set([match[0] for match in matches]))
+        affected_areas = list(dict.fromkeys(match[0] for match in matches))
         supporting_evidence = []
         
         for area, neg, pos in matches:
@@ -221,7 +381,7 @@ class CorrelationEngine:
         return RootCause(
             cause_description=description,
             affected_areas=affected_areas,
-            supporting_evidence=list(set(supporting_evidence)),  # Deduplicate
+            supporting_evidence=list(dict.fromkeys(supporting_evidence)),  # Deduplicate
             confidence=confidence
         )
     
@@ -229,23 +389,10 @@ class CorrelationEngine:
         """Detect conflicting information in observations"""
         conflicts = []
         
-        # Check for contradictory statements
-        for area in areas:
-            all_findings = area.negative_findings + area.positive_findings
-            
-            # Look for contradictions (e.g., "no issue" vs "severe dampness")
-            positive_indicators = ["no issue", "no damage", "good condition", "satisfactory"]
-            negative_indicators = ["severe", "critical", "major", "significant"]
-            
-            has_positive = any(
-                any(indicator in finding.lower() for indicator in positive_indicators)
-                for finding in all_findings
-            )
-            
-            has_negative = any(
-                any(indicator in finding.lower() for indicator in negative_indicators)
-                for finding in all_findings
-            )
+        # Check for contradictory statements (e.g., "no issue" vs "severe dampness")
+        for area, area_mask in zip(areas, self._area_masks):
+            has_positive = area_mask & self._positive_indicator_mask
+            has_negative = area_mask & self._negative_indicator_mask
             
             if has_positive and has_negative:
                 conflicts.append(
@@ -260,27 +407,33 @@ class CorrelationEngine:
         if len(root_causes) <= 1:
             return root_causes
         
-        unique_causes = []
-        seen_descriptions = set()
+        unique_causes: Dict[str, RootCause] = {}
+        # Areas and evidence already on each kept cause, for O(1) merge checks
+        seen: Dict[str, Tuple[set, set]] = {}
         
         for cause in root_causes:
             # Normalize description
             norm_desc = cause.cause_description.lower().strip()
             
-            if norm_desc not in seen_descriptions:
-                seen_descriptions.add(norm_desc)
-                unique_causes.append(cause)
-            else:
-                # Merge with existing cause
-                for existing in unique_causes:
-                    if existing.cause_description.lower().strip() == norm_desc:
-                        # Merge affected areas and evidence
-                        existing.affected_areas = list(set(
-                            existing.affected_areas + cause.affected_areas
-                        ))
-                        existing.supporting_evidence = list(set(
-                            existing.supporting_evidence + cause.supporting_evidence
-                        ))
-                        break
+            existing = unique_causes.get(norm_desc)
+            if existing is None:
+                unique_causes[norm_desc] = cause
+                continue
+            
+            # Merge affected areas and evidence into the existing cause, in order
+            if norm_desc not in seen:
+                existing.affected_areas = list(dict.fromkeys(existing.affected_areas))
+                existing.supporting_evidence = list(dict.fromkeys(existing.supporting_evidence))
+                seen[norm_desc] = (set(existing.affected_areas), set(existing.supporting_evidence))
+            seen_areas, seen_evidence = seen[norm_desc]
+            
+            for area in cause.affected_areas:
+                if area not in seen_areas:
+                    seen_areas.add(area)
+                    existing.affected_areas.append(area)
+            for evidence in cause.supporting_evidence:
+                if evidence not in seen_evidence:
+                    seen_evidence.add(evidence)
+                    existing.supporting_evidence.append(evidence)
         
-        return unique_causes
+        return list(unique_causes.values())
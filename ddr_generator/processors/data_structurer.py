@@ -3,16 +3,39 @@ Data structurer: Converts raw extracted text into structured JSON format.
 Merges inspection and thermal data into AreaObservation objects.
 """
 
-from typing import Dict, List, Optional
+import sys
+from array import array
+from collections import defaultdict
+from functools import lru_cache
+from typing import DefaultDict, Dict, List, Optional
+import numpy as np
 from ..schemas import (
     ExtractionResult, AreaObservation, ThermalEvidence,
     PropertyDetails, DDRReport
 )
 
 
+# Location qualifiers dropped from area names when grouping similar areas
+_AREA_QUALIFIERS = frozenset({
+    "skirting", "ceiling", "wall", "floor", "corner", "external", "internal"
+})
+
+
+# Area names repeat within and across reports, so base names are memoized
+@lru_cache(maxsize=2048)
+def _get_base_area_name(area_name: str) -> str:
+    """Extract base area name (remove skirting, ceiling, wall, etc.)"""
+    # Whole words only, so e.g. "Stairwell" keeps its "well"
+    return sys.intern(" ".join(
+        token for token in area_name.lower().split() if token not in _AREA_QUALIFIERS
+    ).title())
+
+
 class DataStructurer:
     """Converts raw extraction results to structured format"""
     
+    __slots__ = ()
+    
     def __init__(self):
         pass
     
@@ -37,11 +60,12 @@ class DataStructurer:
         all_areas.update(inspection_result.raw_positive_findings.keys())
         all_areas.update(thermal_data.keys())
         
-        # Create AreaObservation for each area
+        # Create AreaObservation for each area; names are interned since they
+        # key the grouping and correlation dicts throughout the pipeline
         areas = []
         for area_name in all_areas:
             area_obs = self._create_area_observation(
-                area_name,
+                sys.intern(area_name),
                 inspection_result.raw_negative_findings.get(area_name, []),
                 inspection_result.raw_positive_findings.get(area_name, []),
                 thermal_data.get(area_name)
@@ -95,14 +119,21 @@ class DataStructurer:
         Returns:
             Report with merged areas
         """
-        # Group areas by base name
-        area_groups: Dict[str, List[AreaObservation]] = {}
+        # Group areas by base name, collecting thermal readings on the way
+        area_groups: DefaultDict[str, List[AreaObservation]] = defaultdict(list)
+        cold_temps: DefaultDict[str, array] = defaultdict(lambda: array("d"))
+        hot_temps: DefaultDict[str, array] = defaultdict(lambda: array("d"))
         
         for area in report.areas:
-            base_name = self._get_base_area_name(area.area_name)
-            if base_name not in area_groups:
-                area_groups[base_name] = []
+            base_name = _get_base_area_name(area.area_name)
             area_groups[base_name].append(area)
+            
+            thermal = area.thermal_evidence
+            if thermal:
+                if thermal.cold_spot_temp:
+                    cold_temps[base_name].append(thermal.cold_spot_temp)
+                if thermal.hot_spot_temp:
+                    hot_temps[base_name].append(thermal.hot_spot_temp)
         
         # Merge areas within each group
         merged_areas = []
@@ -110,7 +141,9 @@ class DataStructurer:
             if len(group) == 1:
                 merged_areas.append(group[0])
             else:
-                merged = self._merge_area_observations(base_name, group)
+                merged = self._merge_area_observations(
+                    base_name, group, cold_temps[base_name], hot_temps[base_name]
+                )
                 merged_areas.append(merged)
         
         report.areas = merged_areas
@@ -118,51 +151,55 @@ class DataStructurer:
     
     def _get_base_area_name(self, area_name: str) -> str:
         """Extract base area name (remove skirting, ceiling, wall, etc.)"""
-        base = area_name.lower()
-        
-        # Remove specific location qualifiers
-        qualifiers = ["skirting", "ceiling", "wall", "floor", "corner", "external", "internal"]
-        for qualifier in qualifiers:
-            base = base.replace(qualifier, "").strip()
-        
-        # Clean up
-        base = " ".join(base.split())  # Remove extra spaces
-        return base.title()
+        return _get_base_area_name(area_name)
     
     def _merge_area_observations(
         self,
         base_name: str,
-        observations: List[AreaObservation]
+        observations: List[AreaObservation],
+        cold_temps: array,
+        hot_temps: array
     ) -> AreaObservation:
-        """Merge multiple area observations into one"""
+        """
+        Merge multiple area observations into one
+        
+        Args:
+            base_name: Name of the merged area
+            observations: Observations to merge
+            cold_temps: Non-zero cold spot readings of the observations
+            hot_temps: Non-zero hot spot readings of the observations
+        
+        Returns:
+            Merged AreaObservation
+        """
         merged = AreaObservation(area_name=base_name)
         
         all_negative = []
         all_positive = []
-        thermal_evidences = []
+        has_thermal = False
         
         for obs in observations:
             all_negative.extend(obs.negative_findings)
             all_positive.extend(obs.positive_findings)
             if obs.thermal_evidence:
-                thermal_evidences.append(obs.thermal_evidence)
+                has_thermal = True
         
         # Remove duplicates while preserving order
         merged.negative_findings = list(dict.fromkeys(all_negative))
         merged.positive_findings = list(dict.fromkeys(all_positive))
         
         # Merge thermal evidence (take min cold, max hot)
-        if thermal_evidences:
+        if has_thermal:
             merged_thermal = ThermalEvidence()
             
-            cold_temps = [t.cold_spot_temp for t in thermal_evidences if t.cold_spot_temp]
-            hot_temps = [t.hot_spot_temp for t in thermal_evidences if t.hot_spot_temp]
+            cold = np.frombuffer(cold_temps, dtype=np.float64)
+            hot = np.frombuffer(hot_temps, dtype=np.float64)
             
-            if cold_temps:
-                merged_thermal.cold_spot_temp = min(cold_temps)
+            if cold.size:
+                merged_thermal.cold_spot_temp = float(cold.min())
                 merged_thermal.has_cold_zones = True
-            if hot_temps:
-                merged_thermal.hot_spot_temp = max(hot_temps)
+            if hot.size:
+                merged_thermal.hot_spot_temp = float(hot.max())
             
             if merged_thermal.cold_spot_temp and merged_thermal.hot_spot_temp:
                 merged_thermal.temp_difference = round(
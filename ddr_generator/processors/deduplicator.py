@@ -3,11 +3,75 @@ Deduplication module: Removes duplicate observations using similarity matching.
 Uses both rule-based and embedding-based approaches.
 """
 
-from typing import List, Set
+import os
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from typing import DefaultDict, Dict, List, Set
 import re
+import numpy as np
 from ..config import config
 
 
+# Filler words and punctuation dropped when normalizing findings
+_FILLER_RE = re.compile(r'\b(?:observed|noticed|found|seen|mild|slight|minor)\b')
+_PUNCT_RE = re.compile(r'[^\w\s]')
+
+# Every ASCII character _PUNCT_RE removes (punctuation and control
+# characters alike), as a translate() deletion table
+_PUNCT_TABLE = str.maketrans('', '', ''.join(
+    c for c in map(chr, range(128)) if _PUNCT_RE.match(c)
+))
+
+
+# Findings repeat across areas and reports, so normalized forms are memoized
+@lru_cache(maxsize=4096)
+def _normalize_text(text: str) -> str:
+    """Normalize text for comparison"""
+    # Lowercase, then remove common filler words and punctuation
+    text = _FILLER_RE.sub('', text.lower())
+    text = text.translate(_PUNCT_TABLE)
+    if not text.isascii():
+        # Non-ASCII symbols (°, –, ’, ...) are not in the table
+        text = _PUNCT_RE.sub('', text)
+    
+    # Remove extra spaces
+    return " ".join(text.split())
+
+
+def _prune_similar_python(similarities: np.ndarray, lengths: np.ndarray,
+                          threshold: float) -> np.ndarray:
+    """
+    Mark which findings survive similarity pruning
+    
+    Of each pair at or above threshold, only the longer (more detailed)
+    finding is kept; ties keep the earlier one.
+    
+    Returns:
+        Boolean keep mask, one entry per finding
+    """
+    n = lengths.shape[0]
+    keep = np.ones(n, dtype=np.bool_)
+    for i in range(n):
+        if not keep[i]:
+            continue
+        for j in range(i + 1, n):
+            if keep[j] and similarities[i, j] >= threshold:
+                if lengths[i] >= lengths[j]:
+                    keep[j] = False
+                else:
+                    keep[i] = False
+                    break
+    return keep
+
+
+try:
+    # Numba compiles the pruning loop to native code, when installed
+    from numba import njit
+    _prune_similar = njit(cache=True)(_prune_similar_python)
+except ImportError:
+    _prune_similar = _prune_similar_python
+
+
 class Deduplicator:
     """Intelligent deduplication of observations"""
     
@@ -15,15 +79,47 @@ class Deduplicator:
         self.dedup_config = config.deduplication
         self.similarity_model = None
         
+        # Embeddings of findings seen before, so recurring boilerplate
+        # findings are encoded once rather than once per area and report
+        self._embed_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        
         # Initialize embedding model if configured
         if self.dedup_config.use_embeddings:
             try:
                 from sentence_transformers import SentenceTransformer
-                self.similarity_model = SentenceTransformer(self.dedup_config.embedding_model)
+                import torch
+                max_threads = self.dedup_config.embedding_max_threads
+                if max_threads:
+                    torch.set_num_threads(min(max_threads, os.cpu_count() or 1))
+                self.similarity_model = self._load_onnx_model(SentenceTransformer)
+                if self.similarity_model is None:
+                    self.similarity_model = SentenceTransformer(self.dedup_config.embedding_model)
             except ImportError:
                 print("Warning: sentence-transformers not installed. Using rule-based deduplication only.")
                 self.similarity_model = None
     
+    def _load_onnx_model(self, model_class):
+        """
+        Load the int8-quantized ONNX Runtime variant of the embedding model
+        
+        Returns:
+            The model, or None when the ONNX backend or export is unavailable
+        """
+        onnx_file = self.dedup_config.embedding_onnx_file
+        if not onnx_file:
+            return None
+        
+        try:
+            return model_class(
+                self.dedup_config.embedding_model,
+                backend="onnx",
+                model_kwargs={"file_name": onnx_file}
+            )
+        except Exception as e:
+            # Older sentence-transformers, no optimum/onnxruntime, or no such export
+            print(f"Warning: ONNX embedding model unavailable ({e}). Using the PyTorch model.")
+            return None
+    
     def deduplicate_findings(self, findings: List[str]) -> List[str]:
         """
         Remove duplicate findings from a list
@@ -78,24 +174,40 @@ class Deduplicator:
     
     def _normalize_text(self, text: str) -> str:
         """Normalize text for comparison"""
-        # Convert to lowercase
-        text = text.lower()
+        return _normalize_text(text)
+    
+    def _embed(self, findings: List[str]) -> np.ndarray:
+        """
+        Unit-length embeddings of findings, encoding only those not cached
         
-        # Remove extra whitespace
-        text = " ".join(text.split())
+        Args:
+            findings: Finding strings
         
-        # Remove common filler words
-        fillers = ["observed", "noticed", "found", "seen", "mild", "slight", "minor"]
-        for filler in fillers:
-            text = re.sub(r'\b' + filler + r'\b', '', text)
+        Returns:
+            Array with one embedding row per finding
+        """
+        cache = self._embed_cache
+        missing = list(dict.fromkeys(finding for finding in findings if finding not in cache))
         
-        # Remove punctuation
-        text = re.sub(r'[^\w\s]', '', text)
+        if missing:
+            # encode() sorts the list by length before batching, so each
+            # batch pads only to its own longest finding
+            encoded = self.similarity_model.encode(
+                missing,
+                batch_size=self.dedup_config.embedding_batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+            cache.update(zip(missing, encoded.astype(self.dedup_config.embedding_dtype, copy=False)))
         
-        # Remove extra spaces again
-        text = " ".join(text.split())
+        embeddings = np.stack([cache[finding] for finding in findings])
+        for finding in findings:
+            cache.move_to_end(finding)
+        while len(cache) > self.dedup_config.embedding_cache_size:
+            cache.popitem(last=False)
         
-        return text
+        return embeddings
     
     def _deduplicate_with_embeddings(self, findings: List[str]) -> List[str]:
         """Use semantic similarity to deduplicate"""
@@ -103,37 +215,19 @@ class Deduplicator:
             return findings
         
         try:
-            from sklearn.metrics.pairwise import cosine_similarity
-            import numpy as np
-            
-            # Generate embeddings
-            embeddings = self.similarity_model.encode(findings)
-            
-            # Calculate pairwise similarities
-            similarities = cosine_similarity(embeddings)
+            embeddings = self._embed(findings)
             
-            # Find groups of similar findings
-            threshold = self.dedup_config.similarity_threshold
-            keep_indices = set(range(len(findings)))
+            # Pairwise cosine similarities: a single matmul of the unit vectors,
+            # widened to float32 since NumPy has no BLAS kernel for float16
+            embeddings = embeddings.astype(np.float32, copy=False)
+            similarities = embeddings @ embeddings.T
             
-            for i in range(len(findings)):
-                if i not in keep_indices:
-                    continue
-                    
-                for j in range(i + 1, len(findings)):
-                    if j not in keep_indices:
-                        continue
-                    
-                    # If very similar, keep only the longer/more detailed one
-                    if similarities[i][j] >= threshold:
-                        if len(findings[i]) >= len(findings[j]):
-                            keep_indices.discard(j)
-                        else:
-                            keep_indices.discard(i)
-                            break
+            # Keep only the longer finding of each similar pair
+            lengths = np.fromiter((len(finding) for finding in findings), dtype=np.int32, count=len(findings))
+            keep = _prune_similar(similarities, lengths, self.dedup_config.similarity_threshold)
             
             # Return findings that should be kept
-            return [findings[i] for i in sorted(keep_indices)]
+            return [findings[i] for i in np.flatnonzero(keep)]
         
         except Exception as e:
             print(f"Warning: Embedding-based deduplication failed: {e}. Falling back to rule-based.")
@@ -149,23 +243,21 @@ class Deduplicator:
         Returns:
             Dict mapping finding -> list of areas where it appears
         """
-        finding_to_areas = {}
+        # Areas per normalized finding, plus the first original wording of each
+        areas_by_norm: DefaultDict[str, List[str]] = defaultdict(list)
+        original_by_norm: Dict[str, str] = {}
         
         for area, findings in area_findings.items():
             for finding in findings:
                 norm = self._normalize_text(finding)
-                if norm not in finding_to_areas:
-                    finding_to_areas[norm] = {
-                        "original_text": finding,
-                        "areas": []
-                    }
-                finding_to_areas[norm]["areas"].append(area)
+                original_by_norm.setdefault(norm, finding)
+                areas_by_norm[norm].append(area)
         
         # Filter to only cross-area duplicates
         cross_area = {
-            data["original_text"]: data["areas"]
-            for norm, data in finding_to_areas.items()
-            if len(data["areas"]) > 1
+            original_by_norm[norm]: areas
+            for norm, areas in areas_by_norm.items()
+            if len(areas) > 1
         }
         
         return cross_area
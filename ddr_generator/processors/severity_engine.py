@@ -3,19 +3,90 @@ Severity assessment engine: Calculates severity scores and provides reasoning.
 Uses multi-factor weighted scoring based on configuration rules.
 """
 
-from typing import List, Tuple, Optional
+from typing import Any, Dict, FrozenSet, List, Sequence, Set, Tuple, Optional
+import numpy as np
 from ..schemas import DDRReport, SeverityAssessment, AreaObservation
 from ..config import config
 
+try:
+    # Aho-Corasick automaton for multi-keyword scans, when installed
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Words the severity rules look for in an area's findings text
+_RULE_TOKENS = ("leakage", "plumbing", "crack", "dampness", "tile", "gap", "mild")
+
+
+def _build_automaton(words: Sequence[str]) -> Optional[Any]:
+    """Aho-Corasick automaton mapping each word to itself, or None if unavailable"""
+    if ahocorasick is None or not words:
+        return None
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        automaton.add_word(word, word)
+    automaton.make_automaton()
+    return automaton
+
+
+def _words_in(automaton: Optional[Any], words: Sequence[str], text_lower: str) -> FrozenSet[str]:
+    """Words contained in lowercased text, in one pass when an automaton is given"""
+    if automaton is not None:
+        return frozenset(word for _, word in automaton.iter(text_lower))
+    return frozenset(word for word in words if word in text_lower)
+
 
 class SeverityEngine:
     """Assesses severity of issues with reasoning"""
     
-    def __init__(self):
+    def __init__(self) -> None:
         self.severity_config = config.severity
         self.weights = self.severity_config.weights
         self.multipliers = self.severity_config.area_multipliers
         self.rules = self.severity_config.rules
+        
+        # Keyword columns and their weights, in configuration order
+        self._keywords = list(self.weights)
+        self._keyword_index = {keyword: k for k, keyword in enumerate(self._keywords)}
+        self._weight_vector = np.fromiter(self.weights.values(), dtype=np.float64, count=len(self._keywords))
+        
+        # Find every weighted keyword / rule token in a single pass over the text
+        self._automaton = _build_automaton(self._keywords)
+        self._rule_automaton = _build_automaton(_RULE_TOKENS)
+        
+        # Lowercased (negative findings, all findings text, area name) per area,
+        # keyed by id(area) for the duration of one assessment
+        self._lowered_areas: Dict[int, Tuple[List[str], str, str]] = {}
+        
+        # Per-assessment keyword state: row of each area (by id), the keywords
+        # detected in its findings, its weighted keyword score and the number
+        # of differently named areas sharing one of its keywords
+        self._area_rows: Dict[int, int] = {}
+        self._detected: List[List[str]] = []
+        self._base_scores = np.zeros(0, dtype=np.float64)
+        self._similar_counts = np.zeros(0, dtype=np.int64)
+    
+    def _lowered(self, area: AreaObservation) -> Tuple[List[str], str, str]:
+        """Lowercased negative findings, joined findings text and area name"""
+        lowered = self._lowered_areas.get(id(area))
+        if lowered is None:
+            negative_lower = [f.lower() for f in area.negative_findings]
+            positive_lower = [f.lower() for f in area.positive_findings]
+            lowered = (negative_lower, " ".join(negative_lower + positive_lower), area.area_name.lower())
+        return lowered
+    
+    def _detect_keywords(self, negative_lower: List[str]) -> List[str]:
+        """Keywords detected per finding, each once per finding in configuration order"""
+        detected: List[str] = []
+        for finding_lower in negative_lower:
+            hits = self._keywords_in(finding_lower)
+            if hits:
+                detected.extend(keyword for keyword in self._keywords if keyword in hits)
+        return detected
+    
+    def _keywords_in(self, text_lower: str) -> FrozenSet[str]:
+        """Weighted keywords contained in lowercased text"""
+        return _words_in(self._automaton, self._keywords, text_lower)
     
     def assess_severity(self, report: DDRReport) -> SeverityAssessment:
         """
@@ -27,14 +98,47 @@ class SeverityEngine:
         Returns:
             SeverityAssessment with scores and reasoning
         """
-        # Calculate severity for each area
-        for area in report.areas:
-            score, reasoning = self._calculate_area_severity(area, report.areas)
-            area.severity_score = score
-            area.severity = self._score_to_level(score)
+        # Lowercase every area once; the rules and keyword scans reuse it
+        self._lowered_areas = {id(area): self._lowered(area) for area in report.areas}
+        try:
+            # (areas x keywords) hit counts; one product gives every base score
+            self._detected = [self._detect_keywords(self._lowered(area)[0]) for area in report.areas]
+            hits = np.zeros((len(report.areas), len(self._keywords)), dtype=np.int32)
+            for row, detected in enumerate(self._detected):
+                for keyword in detected:
+                    hits[row, self._keyword_index[keyword]] += 1
+            self._base_scores = hits @ self._weight_vector
+            self._area_rows = {id(area): row for row, area in enumerate(report.areas)}
+            
+            # Areas sharing a keyword, excluding areas of the same name
+            present = (hits > 0).astype(np.int32)
+            names = np.array([area.area_name for area in report.areas], dtype=object)
+            co_occurring = (present @ present.T) > 0
+            co_occurring &= names[:, None] != names[None, :]
+            self._similar_counts = co_occurring.sum(axis=1)
+            
+            # Calculate severity for each area, grouping areas by priority
+            # and collecting scores in the same pass
+            high_priority: List[str] = []
+            medium_priority: List[str] = []
+            low_priority: List[str] = []
+            priorities = {"HIGH": high_priority, "MEDIUM": medium_priority, "LOW": low_priority}
+            area_scores: List[float] = []
+            for area in report.areas:
+                score, reasoning = self._calculate_area_severity(area, report.areas)
+                level = self._score_to_level(score)
+                area.severity_score = score
+                area.severity = level
+                priorities[level].append(area.area_name)
+                if score:
+                    area_scores.append(score)
+        finally:
+            self._lowered_areas = {}
+            self._area_rows = {}
+            self._detected = []
+            self._similar_counts = np.zeros(0, dtype=np.int64)
         
         # Calculate overall severity
-        area_scores = [area.severity_score for area in report.areas if area.severity_score]
         
         if not area_scores:
             overall_score = 0.0
@@ -45,12 +149,10 @@ class SeverityEngine:
             overall_score = (max(area_scores) * 0.6 + sum(area_scores) / len(area_scores) * 0.4)
             overall_score = min(1.0, overall_score)  # Cap at 1.0
             overall_level = self._score_to_level(overall_score)
-            reasoning = self._generate_overall_reasoning(report, overall_score)
-        
-        # Categorize areas by priority
-        high_priority = [a.area_name for a in report.areas if a.severity == "HIGH"]
-        medium_priority = [a.area_name for a in report.areas if a.severity == "MEDIUM"]
-        low_priority = [a.area_name for a in report.areas if a.severity == "LOW"]
+            reasoning = self._generate_overall_reasoning(
+                report, overall_score,
+                len(high_priority), len(medium_priority), len(low_priority)
+            )
         
         return SeverityAssessment(
             overall_severity=overall_level,
@@ -75,17 +177,17 @@ class SeverityEngine:
         if not area.has_issues():
             return 0.0, "No issues found"
         
-        score = 0.0
-        reasoning_parts = []
+        negative_lower, _, area_lower = self._lowered(area)
         
         # Factor 1: Type and severity of findings
-        for finding in area.negative_findings:
-            finding_lower = finding.lower()
-            
-            for keyword, weight in self.weights.items():
-                if keyword in finding_lower:
-                    score += weight
-                    reasoning_parts.append(f"{keyword} detected")
+        row = self._area_rows.get(id(area))
+        if row is not None:
+            detected = self._detected[row]
+            score = float(self._base_scores[row])
+        else:
+            detected = self._detect_keywords(negative_lower)
+            score = float(sum(self.weights[keyword] for keyword in detected))
+        reasoning_parts = [f"{keyword} detected" for keyword in detected]
         
         # Factor 2: Number of issues
         issue_count = len(area.negative_findings) + len(area.positive_findings)
@@ -99,7 +201,6 @@ class SeverityEngine:
             reasoning_parts.append("thermal evidence of moisture")
         
         # Factor 4: Area type multiplier
-        area_lower = area.area_name.lower()
         for area_type, multiplier in self.multipliers.items():
             if area_type == "structural" and any(k in area_lower for k in ["wall", "ceiling", "external"]):
                 score *= multiplier
@@ -109,12 +210,15 @@ class SeverityEngine:
                 reasoning_parts.append("wet area concerns")
         
         # Check if issue appears in multiple areas
-        area_issue_keywords = self._extract_keywords(area.negative_findings)
-        similar_count = sum(
-            1 for other in all_areas
-            if other.area_name != area.area_name and
-            any(kw in self._extract_keywords(other.negative_findings) for kw in area_issue_keywords)
-        )
+        if row is not None:
+            similar_count = int(self._similar_counts[row])
+        else:
+            area_issue_keywords = frozenset(detected)
+            similar_count = sum(
+                1 for other in all_areas
+                if other.area_name != area.area_name and
+                not area_issue_keywords.isdisjoint(self._extract_keywords(self._lowered(other)[0]))
+            )
         
         if similar_count >= 2:
             score *= self.multipliers["multiple_areas"]
@@ -144,33 +248,34 @@ class SeverityEngine:
         all_areas: List[AreaObservation]
     ) -> Optional[Tuple[str, str]]:
         """Check if area matches any predefined severity rules"""
-        all_text = " ".join(area.negative_findings + area.positive_findings).lower()
+        _, all_text, area_lower = self._lowered(area)
+        tokens = _words_in(self._rule_automaton, _RULE_TOKENS, all_text)
         
         # Check active leakage + plumbing
-        if "leakage" in all_text and "plumbing" in all_text:
+        if "leakage" in tokens and "plumbing" in tokens:
             return self.rules["active_leakage_plumbing"]
         
         # Check external crack + internal dampness
-        if "crack" in all_text and "dampness" in all_text:
+        if "crack" in tokens and "dampness" in tokens:
             return self.rules["external_crack_internal_damp"]
         
         # Check recurring dampness (in findings)
-        dampness_areas = [a for a in all_areas if any("dampness" in f.lower() for f in a.negative_findings)]
+        dampness_areas = [a for a in all_areas if any("dampness" in f for f in self._lowered(a)[0])]
         if len(dampness_areas) >= 3:
             return self.rules["recurring_dampness"]
         
         # Check skirting dampness in multiple areas
-        if "skirting" in area.area_name.lower() and "dampness" in all_text:
-            skirting_count = sum(1 for a in all_areas if "skirting" in a.area_name.lower())
+        if "skirting" in area_lower and "dampness" in tokens:
+            skirting_count = sum(1 for a in all_areas if "skirting" in self._lowered(a)[2])
             if skirting_count >= 2:
                 return self.rules["skirting_dampness_multiple"]
         
         # Check tile gaps + dampness
-        if ("tile" in all_text and "gap" in all_text) and "dampness" in all_text:
+        if ("tile" in tokens and "gap" in tokens) and "dampness" in tokens:
             return self.rules["tile_gaps_adjacent_damp"]
         
         # Check mild isolated issues
-        if "mild" in all_text and len(area.negative_findings) == 1:
+        if "mild" in tokens and len(area.negative_findings) == 1:
             return self.rules["mild_isolated"]
         
         return None
@@ -184,25 +289,24 @@ class SeverityEngine:
         else:
             return "LOW"
     
-    def _extract_keywords(self, findings: List[str]) -> List[str]:
-        """Extract key issue keywords from findings"""
-        keywords = []
-        for finding in findings:
-            finding_lower = finding.lower()
-            for keyword in self.weights.keys():
-                if keyword in finding_lower:
-                    keywords.append(keyword)
-        return list(set(keywords))
+    def _extract_keywords(self, findings_lower: List[str]) -> FrozenSet[str]:
+        """Extract key issue keywords from lowercased findings"""
+        keywords: Set[str] = set()
+        for finding_lower in findings_lower:
+            keywords |= self._keywords_in(finding_lower)
+        return frozenset(keywords)
     
-    def _generate_overall_reasoning(self, report: DDRReport, overall_score: float) -> str:
-        """Generate overall severity reasoning"""
+    def _generate_overall_reasoning(
+        self,
+        report: DDRReport,
+        overall_score: float,
+        high_count: int,
+        medium_count: int,
+        low_count: int
+    ) -> str:
+        """Generate overall severity reasoning from the per-level area counts"""
         parts = []
         
-        # Count areas by severity
-        high_count = sum(1 for a in report.areas if a.severity == "HIGH")
-        medium_count = sum(1 for a in report.areas if a.severity == "MEDIUM")
-        low_count = sum(1 for a in report.areas if a.severity == "LOW")
-        
         if high_count > 0:
             parts.append(f"{high_count} area(s) require immediate attention")
         if medium_count > 0:
@@ -2,10 +2,16 @@
 FastAPI Server for DDR Generator
 Exposes the generation pipeline as a REST API.
 """
+import asyncio
+import hashlib
+import json
 import os
-import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 from fastapi import FastAPI, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
@@ -14,6 +20,13 @@ from pydantic import BaseModel
 # Import existing pipeline
 from ddr_generator.main import DDRPipeline
 from ddr_generator.config import config
+from ddr_generator.generators.ddr_generator import LLM_ERROR_MARKER
+
+try:
+    # Faster JSON encoding/decoding for cached results, when installed
+    import orjson
+except ImportError:
+    orjson = None
 
 app = FastAPI(title="DDR Generator API", version="1.0.0")
 
@@ -62,6 +75,120 @@ UPLOAD_DIR.mkdir(exist_ok=True)
 OUTPUT_DIR = Path("ddr_generator/output")
 OUTPUT_DIR.mkdir(exist_ok=True, parents=True)
 
+# Uploads are copied to disk in 1 MiB chunks
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Results of previous analyses, keyed by the SHA-256 of the uploaded PDF and
+# the LLM settings that produced them
+RESULT_CACHE_DIR = OUTPUT_DIR / "cache"
+RESULT_CACHE_DIR.mkdir(exist_ok=True)
+RESULT_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+def _json_loads(data: bytes) -> Any:
+    """Decode JSON bytes, with orjson when available"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Encode an object as JSON bytes, with orjson when available"""
+    return orjson.dumps(obj) if orjson is not None else json.dumps(obj).encode('utf-8')
+
+
+def _result_cache_key(pdf_digest: str) -> str:
+    """Cache key for a PDF under the current provider, models and generation settings"""
+    api = config.api
+    providers = [api.llm_provider, *api.fallback_providers]
+    settings = {
+        "providers": providers,
+        "models": {provider: getattr(api, f"{provider}_model", None) for provider in providers},
+        "section_models": {provider: dict(models) for provider, models in api.section_models.items()},
+        "combine_sections": api.combine_sections,
+    }
+    return hashlib.sha256(
+        pdf_digest.encode('utf-8') + _json_dumps(settings)
+    ).hexdigest()
+
+
+def _load_cached_result(digest: str) -> Optional[Tuple[str, Dict[str, Any], str]]:
+    """Return (markdown, report JSON, filename) for a previously analyzed PDF, if still fresh"""
+    md_path = RESULT_CACHE_DIR / f"{digest}.md"
+    json_path = RESULT_CACHE_DIR / f"{digest}.json"
+    try:
+        if time.time() - json_path.stat().st_mtime > RESULT_CACHE_TTL_SECONDS:
+            return None
+        md_content = md_path.read_text(encoding='utf-8')
+        cached = _json_loads(json_path.read_bytes())
+        return md_content, cached["report_json"], cached["filename"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _store_cached_result(digest: str, md_content: str, json_content: Dict[str, Any], filename: str):
+    """Save an analysis result under the hash of its PDF"""
+    (RESULT_CACHE_DIR / f"{digest}.md").write_text(md_content, encoding='utf-8')
+    # JSON last: its presence and mtime mark the entry as complete
+    (RESULT_CACHE_DIR / f"{digest}.json").write_bytes(
+        _json_dumps({"filename": filename, "report_json": json_content})
+    )
+
+# Pipelines run in worker processes so analyses don't block the event loop
+# or each other; each worker loads its own pipeline once
+MAX_PIPELINE_WORKERS = min(4, os.cpu_count() or 1)
+
+
+@lru_cache(maxsize=1)
+def get_pipeline() -> DDRPipeline:
+    """Pipeline shared by every request in this process, built on first use"""
+    return DDRPipeline(llm_provider=config.api.llm_provider)
+
+
+def _init_pipeline_worker():
+    """Load the pipeline (and its models) when a worker process starts"""
+    get_pipeline()
+
+
+def _run_pipeline(inspection_pdf_path: str, output_dir: str,
+                  report_name: str) -> Tuple[str, Dict[str, Any], str, bool]:
+    """
+    Generate and export a DDR report in a worker process, naming the
+    exports after report_name (the uploaded file's name)
+    
+    Returns:
+        Tuple of (markdown content, report JSON, markdown filename, whether
+        every section was generated and the result may be cached)
+    """
+    pipeline = get_pipeline()
+    
+    # The pipeline returns the generated report object
+    report = pipeline.process(
+        inspection_pdf_path=inspection_pdf_path,
+        thermal_pdf_path=None  # Thermal optional for now
+    )
+    
+    # Export returns the paths it wrote, so no output folder scan is needed
+    md_path, _ = pipeline.export_reports(report, output_dir, inspection_pdf_path, base_name=report_name)
+    
+    # The report is already in memory; no need to re-read the exported JSON
+    md_content = md_path.read_text(encoding='utf-8')
+    complete = LLM_ERROR_MARKER not in md_content
+    return md_content, report.model_dump(mode="json"), md_path.name, complete
+
+
+executor = ProcessPoolExecutor(max_workers=MAX_PIPELINE_WORKERS, initializer=_init_pipeline_worker)
+
+
+@app.on_event("startup")
+async def warm_pipeline():
+    """Start the workers so the first request doesn't pay for model loading"""
+    await asyncio.get_running_loop().run_in_executor(executor, _init_pipeline_worker)
+
+
+@app.on_event("shutdown")
+def shutdown_executor():
+    """Stop the pipeline worker processes"""
+    executor.shutdown(wait=False, cancel_futures=True)
+
 class AnalysisResponse(BaseModel):
     success: bool
     report_md: str
@@ -87,74 +214,41 @@ async def analyze_report(
     if not inspection_file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
     
-    # Save uploaded file temporarily
-    temp_path = UPLOAD_DIR / inspection_file.filename
+    # Save uploaded file temporarily, under a unique name: requests overlap,
+    # and uploads may share a filename
+    buffer = tempfile.NamedTemporaryFile(dir=UPLOAD_DIR, suffix=".pdf", delete=False)
+    temp_path = Path(buffer.name)
     try:
-        with temp_path.open("wb") as buffer:
-            shutil.copyfileobj(inspection_file.file, buffer)
+        # Stream the upload in large chunks, yielding to the event loop between reads,
+        # and hash it on the way through
+        sha256 = hashlib.sha256()
+        with buffer:
+            while chunk := await inspection_file.read(UPLOAD_CHUNK_SIZE):
+                buffer.write(chunk)
+                sha256.update(chunk)
+        digest = _result_cache_key(sha256.hexdigest())
             
         # Run pipeline
         try:
-            print(f"Starting analysis for: {temp_path}")
-            pipeline = DDRPipeline(llm_provider=config.api.llm_provider)
-            
-            # The pipeline returns the generated report object
-            # We need to capture the file paths it created
-            print(f"DEBUG: Calling pipeline.process method on {pipeline}")
-            print(f"DEBUG: Has process? {hasattr(pipeline, 'process')}")
-            print(f"DEBUG: Has process_files? {hasattr(pipeline, 'process_files')}")
-            
-            report = pipeline.process(
-                inspection_pdf_path=str(temp_path),
-                thermal_pdf_path=None,  # Thermal optional for now
-                output_dir=str(OUTPUT_DIR)
-            )
-            
-            # Read the generated markdown content
-            # Pipeline saves to output folder with timestamp
-            # We need to find the latest file or return the content directly
-            # Since pipeline method doesn't return path, let's find the latest file
-            # Or better, modify pipeline to return paths?
-            # For now, let's just find the latest created file matching the input name
-            
-            # Actually, let's read the object returned 'report' and format it immediately?
-            # No, the 'pipeline.process_files' returns the populated DDRReport object.
-            # We can re-generate the markdown string here to send back to frontend!
-            
-            # Find the generated report file
-            # Pipeline saves as {filename}_DDR_{timestamp}.md
-            # We'll look for the most recent .md file in output folder
-            
-            import glob
-            import os
-            
-            # Pattern: OUTPUT_DIR / specific_filename_pattern
-            # Note: filename without extension
-            base_name = Path(inspection_file.filename).stem
-            search_pattern = str(OUTPUT_DIR / f"{base_name}_DDR_*.md")
-            
-            files = glob.glob(search_pattern)
-            if not files:
-                 raise Exception("Report file not found after generation")
-                 
-            # Get latest file
-            md_path = max(files, key=os.path.getctime)
-            json_path = md_path.replace('.md', '.json')
-            
-            print(f"DEBUG: Found generated report at {md_path}")
-            
-            with open(md_path, 'r', encoding='utf-8') as f:
-                md_content = f.read()
-                
-            import json
-            with open(json_path, 'r', encoding='utf-8') as f:
-                json_content = json.load(f)
+            cached = _load_cached_result(digest)
+            if cached:
+                print(f"Returning cached analysis for: {inspection_file.filename}")
+                md_content, json_content, filename = cached
+            else:
+                print(f"Starting analysis for: {inspection_file.filename}")
+                md_content, json_content, filename, complete = await asyncio.get_running_loop().run_in_executor(
+                    executor, _run_pipeline, str(temp_path), str(OUTPUT_DIR),
+                    Path(inspection_file.filename).stem
+                )
+                # Reports with failed sections are served but not cached
+                if complete:
+                    _store_cached_result(digest, md_content, json_content, filename)
                 
             return AnalysisResponse(
                 success=True,
                 report_md=md_content,
                 report_json=json_content,
-                filename=Path(md_path).name
+                filename=filename
             )
             
         except Exception as e:
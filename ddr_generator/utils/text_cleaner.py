@@ -3,7 +3,25 @@ Text cleaning utilities for consistent extraction.
 """
 
 import re
-from typing import List
+from functools import lru_cache
+from typing import List, Pattern
+
+# Patterns compiled once at import rather than looked up per call
+_WS_RE = re.compile(r'\s+')
+_SENT_RE = re.compile(r'[.!?]+')
+
+# Signed integers and decimals; shared with validators
+NUMBER_RE = re.compile(r'[-+]?\d*\.?\d+')
+
+# OCR debris (NUL, U+FFFD replacement char) to drop and smart quotes to straighten
+_CLEAN_TABLE = str.maketrans({
+    "\x00": None,
+    "\ufffd": None,
+    "\u201c": '"',
+    "\u201d": '"',
+    "\u2018": "'",
+    "\u2019": "'",
+})
 
 
 def clean_text(text: str) -> str:
@@ -18,57 +36,71 @@ def clean_text(text: str) -> str:
     """
     if not text:
         return ""
-    
-    # Remove extra whitespace
-    text = " ".join(text.split())
-    
-    # Fix common OCR errors
-    text = text.replace("�", "")
-    text = text.replace("\x00", "")
-    
-    # Normalize quotes
-    text = text.replace(""", '"').replace(""", '"')
-    text = text.replace("'", "'").replace("'", "'")
-    
-    # Remove multiple spaces
-    text = re.sub(r'\s+', ' ', text)
-    
-    return text.strip()
+    return _clean_text(text)
+
+
+# Extraction repeats headers/footers and other boilerplate, so cleaned forms are memoized
+@lru_cache(maxsize=1024)
+def _clean_text(text: str) -> str:
+    """Clean non-empty text (see clean_text)"""
+    # Fix common OCR errors and normalize quotes, then collapse whitespace
+    # runs (including any left around removed characters) in a single pass
+    return _WS_RE.sub(' ', text.translate(_CLEAN_TABLE)).strip()
 
 
+def clear_cache():
+    """Reset the memoized results of clean_text and normalize_area_name (e.g. in tests)"""
+    _clean_text.cache_clear()
+    normalize_area_name.cache_clear()
+
+
+# Common area name variants and their canonical form
+_AREA_REPLACEMENTS = {
+    "master bed room": "master bedroom",
+    "master br": "master bedroom",
+    "m bedroom": "master bedroom",
+    "common bed room": "common bedroom",
+    "common br": "common bedroom",
+    "c bedroom": "common bedroom",
+    "bath room": "bathroom",
+    "common bathroom": "common bathroom",
+    "master bathroom": "master bathroom",
+    "car park": "parking",
+    "living room": "hall",
+    "drawing room": "hall",
+}
+
+# One alternation over all variants, longest first so the most specific wins
+_AREA_VARIANT_RE = re.compile(
+    "|".join(re.escape(old) for old in sorted(_AREA_REPLACEMENTS, key=len, reverse=True))
+)
+
+
+def _replace_area_variant(match) -> str:
+    return _AREA_REPLACEMENTS[match.group()]
+
+
+# Area names come from a small vocabulary, so normalized forms are memoized
+@lru_cache(maxsize=256)
 def normalize_area_name(area: str) -> str:
     """Normalize area names for consistency"""
     area = clean_text(area)
     
-    # Common replacements
-    replacements = {
-        "master bed room": "master bedroom",
-        "master br": "master bedroom",
-        "m bedroom": "master bedroom",
-        "common bed room": "common bedroom",
-        "common br": "common bedroom",
-        "c bedroom": "common bedroom",
-        "bath room": "bathroom",
-        "common bathroom": "common bathroom",
-        "master bathroom": "master bathroom",
-        "car park": "parking",
-        "living room": "hall",
-        "drawing room": "hall",
-    }
-    
-    area_lower = area.lower()
-    for old, new in replacements.items():
-        if old in area_lower:
-            area_lower = area_lower.replace(old, new)
+    # Rewrite every known variant in a single scan of the name
+    area_lower = _AREA_VARIANT_RE.sub(_replace_area_variant, area.lower())
     
     return area_lower.title()
 
 
 def extract_numbers(text: str) -> List[float]:
     """Extract numeric values from text"""
-    pattern = r'[-+]?\d*\.?\d+'
-    matches = re.findall(pattern, text)
-    return [float(m) for m in matches]
+    return list(map(float, NUMBER_RE.findall(text)))
+
+
+@lru_cache(maxsize=16)
+def _special_chars_pattern(keep: str) -> Pattern[str]:
+    """Compiled pattern matching everything outside alphanumerics, whitespace and keep"""
+    return re.compile(rf'[^a-zA-Z0-9\s{re.escape(keep)}]')
 
 
 def remove_special_chars(text: str, keep: str = "") -> str:
@@ -82,19 +114,22 @@ def remove_special_chars(text: str, keep: str = "") -> str:
     Returns:
         Text with special chars removed
     """
-    pattern = f'[^a-zA-Z0-9\s{re.escape(keep)}]'
-    return re.sub(pattern, '', text)
+    return _special_chars_pattern(keep).sub('', text)
 
 
 def truncate_text(text: str, max_length: int = 200, suffix: str = "...") -> str:
     """Truncate text to max length"""
     if len(text) <= max_length:
         return text
-    return text[:max_length - len(suffix)] + suffix
+    cut = max_length - len(suffix)
+    if cut <= 0:
+        # No room for any text: a suffix longer than max_length is itself cut
+        return suffix[:max_length]
+    return text[:cut] + suffix
 
 
 def split_into_sentences(text: str) -> List[str]:
     """Split text into sentences"""
     # Simple sentence splitter
-    sentences = re.split(r'[.!?]+', text)
-    return [s.strip() for s in sentences if s.strip()]
+    # Strip each candidate once, dropping the empty ones
+    return [s for s in map(str.strip, _SENT_RE.split(text)) if s]
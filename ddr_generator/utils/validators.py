@@ -2,8 +2,20 @@
 Validation utilities for data quality checks.
 """
 
+import re
+from operator import methodcaller
 from typing import List, Dict, Any
 from ..schemas import DDRReport, AreaObservation
+from .text_cleaner import NUMBER_RE
+
+# Technical terms that should not appear unless the source mentions them
+_TECHNICAL_TERMS = (
+    "asbestos", "mold", "mildew", "fungus", "structural failure",
+    "foundation", "subsidence", "settlement"
+)
+_TECH_RE = re.compile("|".join(map(re.escape, _TECHNICAL_TERMS)))
+
+_has_issues = methodcaller("has_issues")
 
 
 def validate_report_completeness(report: DDRReport) -> Dict[str, Any]:
@@ -26,16 +38,16 @@ def validate_report_completeness(report: DDRReport) -> Dict[str, Any]:
     if not report.areas:
         issues.append("No areas found in report")
     else:
-        areas_with_issues = [a for a in report.areas if a.has_issues()]
-        if not areas_with_issues:
+        # Stops at the first area with issues instead of listing them all
+        if not any(map(_has_issues, report.areas)):
             warnings.append("No issues found in any area")
     
     # Check for empty findings
     for area in report.areas:
-        if area.negative_findings:
-            for finding in area.negative_findings:
-                if len(finding.strip()) < 3:
-                    warnings.append(f"Very short finding in {area.area_name}: '{finding}'")
+        for finding in area.negative_findings:
+            stripped = finding.strip()
+            if len(stripped) < 3:
+                warnings.append(f"Very short finding in {area.area_name}: '{stripped}'")
     
     # Check severity assessment
     if not report.severity_assessment:
@@ -75,14 +87,20 @@ def calculate_quality_score(report: DDRReport) -> float:
     if report.property_details.inspection_date:
         score += 0.5
     
+    # Per-area tallies, gathered in a single pass
+    n_areas = len(report.areas)
+    thermal_count = 0
+    for area in report.areas:
+        if area.thermal_evidence:
+            thermal_count += 1
+    
     # Areas with data (2 points)
-    if report.areas:
+    if n_areas:
         score += 2.0
     
     # Thermal evidence (1 point)
-    thermal_count = sum(1 for a in report.areas if a.thermal_evidence)
     if thermal_count > 0:
-        score += min(1.0, thermal_count / len(report.areas) if report.areas else 0)
+        score += min(1.0, thermal_count / n_areas)
     
     # Correlation (2 points)
     if report.correlation_result:
@@ -123,12 +141,14 @@ def check_for_hallucinations(
     """
     hallucinations = []
     
-    # Check for specific numbers/measurements not in source
-    import re
-    numbers_in_generated = set(re.findall(r'\d+(?:\.\d+)?', generated_text))
-    numbers_in_source = set()
-    for source in source_data:
-        numbers_in_source.update(re.findall(r'\d+(?:\.\d+)?', source))
+    # Sources are scanned as one newline-joined text; the newline keeps
+    # numbers and terms from running across source boundaries
+    source_text = "\n".join(source_data)
+    
+    # Check for specific numbers/measurements not in source; signs are
+    # dropped so "-5" and "5" (e.g. ranges like "10-15") compare equal
+    numbers_in_generated = {m.group().lstrip("+-") for m in NUMBER_RE.finditer(generated_text)}
+    numbers_in_source = {m.group().lstrip("+-") for m in NUMBER_RE.finditer(source_text)}
     
     unexpected_numbers = numbers_in_generated - numbers_in_source
     if unexpected_numbers:
@@ -136,16 +156,12 @@ def check_for_hallucinations(
             f"Numbers not in source data: {', '.join(unexpected_numbers)}"
         )
     
-    # Check for specific technical terms not in source
-    technical_terms = [
-        "asbestos", "mold", "mildew", "fungus", "structural failure",
-        "foundation", "subsidence", "settlement"
-    ]
-    
-    for term in technical_terms:
-        if term.lower() in generated_text.lower():
-            source_has_term = any(term.lower() in s.lower() for s in source_data)
-            if not source_has_term:
+    # Check for specific technical terms not in source (one scan per text)
+    terms_in_generated = set(_TECH_RE.findall(generated_text.lower()))
+    if terms_in_generated:
+        terms_in_source = set(_TECH_RE.findall(source_text.lower()))
+        for term in _TECHNICAL_TERMS:
+            if term in terms_in_generated and term not in terms_in_source:
                 hallucinations.append(f"Technical term not in source: '{term}'")
     
     return hallucinations
@@ -1,22 +1,33 @@
-import google.generativeai as genai
 import os
 from dotenv import load_dotenv
 
-load_dotenv('ddr_generator/.env')
 
-api_key = os.getenv("GEMINI_API_KEY")
-print(f"API Key found: {api_key[:20]}...")
+def main():
+    # Imported here: google.generativeai pulls in protobuf and gRPC
+    import google.generativeai as genai
+    
+    load_dotenv('ddr_generator/.env')
+    
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        print("GEMINI_API_KEY not set (checked environment and ddr_generator/.env)")
+        return
+    print(f"API Key found: {api_key[:20]}...")
+    
+    genai.configure(api_key=api_key)
+    
+    print("\nAvailable models that support generateContent:")
+    print("=" * 60)
+    
+    try:
+        for model in genai.list_models():
+            if 'generateContent' in model.supported_generation_methods:
+                print(f"✓ {model.name}")
+                print(f"  Display: {model.display_name}")
+                print()
+    except Exception as e:
+        print(f"Error: {e}")
 
-genai.configure(api_key=api_key)
 
-print("\nAvailable models that support generateContent:")
-print("=" * 60)
-
-try:
-    for model in genai.list_models():
-        if 'generateContent' in model.supported_generation_methods:
-            print(f"✓ {model.name}")
-            print(f"  Display: {model.display_name}")
-            print()
-except Exception as e:
-    print(f"Error: {e}")
+if __name__ == "__main__":
+    main()
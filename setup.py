@@ -1,5 +1,7 @@
 """Setup script for DDR Generator package"""
 
+import codecs
+import os
 from setuptools import setup, find_packages
 from pathlib import Path
 
@@ -7,15 +9,37 @@ from pathlib import Path
 readme_file = Path(__file__).parent / "README.md"
 long_description = readme_file.read_text(encoding="utf-8") if readme_file.exists() else ""
 
-# Read requirements
+# Read requirements (decoded explicitly: the file may be UTF-16 with a BOM,
+# as written by some Windows editors, or UTF-8 with or without one)
 requirements_file = Path(__file__).parent / "requirements.txt"
-requirements = []
-if requirements_file.exists():
-    requirements = [
-        line.strip() 
-        for line in requirements_file.read_text().splitlines() 
-        if line.strip() and not line.startswith("#")
-    ]
+raw_requirements = requirements_file.read_bytes() if requirements_file.exists() else b""
+if raw_requirements.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+    requirements_text = raw_requirements.decode("utf-16")
+else:
+    requirements_text = raw_requirements.decode("utf-8-sig")
+requirements = [
+    line
+    for line in (raw_line.strip() for raw_line in requirements_text.splitlines())
+    if line and line[0] != "#"
+]
+
+# Optional AOT build of the extraction and severity scoring hot paths with
+# mypyc (DDR_MYPYC=1). The pure-Python modules remain the fallback when mypyc
+# is not available. Imported modules (e.g. the pydantic schemas) are read for
+# types only and stay interpreted.
+ext_modules = []
+if os.environ.get("DDR_MYPYC") == "1":
+    try:
+        from mypyc.build import mypycify
+        ext_modules = mypycify([
+            "--ignore-missing-imports",
+            "--follow-imports=silent",
+            "ddr_generator/extractors/pdf_parser.py",
+            "ddr_generator/extractors/inspection_parser.py",
+            "ddr_generator/processors/severity_engine.py",
+        ])
+    except ImportError:
+        print("mypyc not installed; building pure-Python package")
 
 setup(
     name="ddr-generator",
@@ -27,6 +51,7 @@ setup(
     python_requires=">=3.9",
     packages=find_packages(),
     install_requires=requirements,
+    ext_modules=ext_modules,
     entry_points={
         "console_scripts": [
             "ddr-generate=ddr_generator.main:main",